@@ -7,12 +7,36 @@ Usage:
 Open: http://127.0.0.1:5000/
 
 Dependencies:
-  pip install flask requests networkx matplotlib
+  pip install flask requests networkx matplotlib numpy
+  pip install orjson   # optional, faster JSON parsing
+  pip install igraph   # optional, faster graph layout
 """
-import os, uuid, time, csv, math, shutil
-from collections import defaultdict
-from flask import Flask, request, render_template_string, send_from_directory, redirect, url_for, flash
-import requests, networkx as nx
+import os, sys, io, uuid, time, csv, random, shutil, threading, json, sqlite3, hashlib, functools, itertools, zlib
+from collections import defaultdict, Counter
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+from flask import Flask, Response, request, send_from_directory, redirect, url_for, flash, jsonify
+from werkzeug.security import safe_join
+import requests, requests.adapters, networkx as nx
+import numpy as np
+try:
+    import orjson  # optional: much faster parsing of large tx / address-history payloads
+except ImportError:
+    orjson = None
+try:
+    import igraph  # optional: C implementation of Fruchterman-Reingold for graph layouts
+except ImportError:
+    igraph = None
+try:
+    import numba  # optional: JIT-compiled change-scoring kernel
+except ImportError:
+    numba = None
+try:
+    from scipy.sparse import coo_matrix  # optional: C connected components for address clustering
+    from scipy.sparse.csgraph import connected_components
+except ImportError:
+    connected_components = None
 
 # HEADLESS matplotlib setup before pyplot import
 os.environ.setdefault("MPLBACKEND", "Agg")
@@ -22,23 +46,176 @@ import matplotlib.pyplot as plt
 
 # Config
 ESPLORA = os.environ.get("ESPLORA_API", "https://blockstream.info/api")
-SLEEP = float(os.environ.get("ESPLORA_SLEEP", "0.25"))
+BATCH = int(os.environ.get("ESPLORA_BATCH", "8"))  # max concurrent Esplora requests per run
+RPS = float(os.environ.get("ESPLORA_RPS", "10"))    # shared request budget (requests/second, <=0 disables)
+MAX_TXIDS = int(os.environ.get("MAX_TXIDS", "1000"))  # cap on txids accepted by one /analyze request
+MAX_CLUSTER_TXS = int(os.environ.get("MAX_CLUSTER_TXS", "2000"))  # cap on address txs scanned by one /clusters request
+PREVIEW_PAGE = 50  # CSV preview rows inlined in the results page; more are paged in via /preview
 OUTPUT_ROOT = "outputs"
 os.makedirs(OUTPUT_ROOT, exist_ok=True)
+CACHE_PATH = os.environ.get("ESPLORA_CACHE", os.path.join(OUTPUT_ROOT, "esplora_cache.sqlite"))  # "" disables
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens/second, bursts up to `capacity`."""
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(rate, 1))
+        self.tokens = self.capacity
+        self.ts = time.monotonic()
+        self.lock = threading.Lock()
+
+    def consume(self, n=1):
+        """Block until n tokens are available, then take them."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.ts) * self.rate)
+                self.ts = now
+                if self.tokens >= n:
+                    self.tokens -= n
+                    return
+                wait = (n - self.tokens) / self.rate
+            time.sleep(wait)
+
+_BUCKET = TokenBucket(RPS)
+
+# one keep-alive session for all Esplora traffic: TCP/TLS handshakes are paid once per
+# pooled connection instead of once per request
+_SESSION = requests.Session()
+_adapter = requests.adapters.HTTPAdapter(pool_connections=32, pool_maxsize=max(32, BATCH))
+_SESSION.mount("https://", _adapter)
+_SESSION.mount("http://", _adapter)
+RETRY_STATUS = (429, 502, 503, 504)
+
+def _retry_delay(resp, attempt, base=0.25, cap=60):
+    """Seconds to wait before retrying: honor Retry-After (seconds form), else capped exponential backoff."""
+    h = (resp.headers.get("Retry-After") or "").strip()
+    if h.isdecimal():
+        return min(int(h), cap)
+    return min(base * (2 ** attempt), cap)
+
+def _esplora_get(url, timeout=30, retries=5):
+    """
+    GET an Esplora URL and return parsed JSON.
+    Every attempt draws from the shared rate limiter; throttling / transient gateway
+    responses (429, 502-504) are retried up to `retries` times before raising.
+    """
+    for attempt in range(retries + 1):
+        _BUCKET.consume()
+        r = _SESSION.get(url, timeout=timeout)
+        if r.status_code in RETRY_STATUS and attempt < retries:
+            time.sleep(_retry_delay(r, attempt))
+            continue
+        r.raise_for_status()
+        return _json_loads(r.content)
+
+def _json_loads(data):
+    return orjson.loads(data) if orjson else json.loads(data)
+
+def _json_dumps(obj):
+    """Compact JSON text."""
+    return orjson.dumps(obj).decode() if orjson else json.dumps(obj, separators=(",", ":"))
+
+# Response cache: an in-process L1 dict in front of an on-disk sqlite store, so
+# re-analysing overlapping txids across runs/restarts doesn't refetch everything.
+TTL_TX = 86400 * 7            # confirmed txs are immutable
+TTL_TX_UNCONFIRMED = 60
+TTL_OUTSPENDS = 86400 * 7     # every output spent in a confirmed tx: final (barring reorgs)
+TTL_OUTSPENDS_PARTIAL = 60    # any output still unspent may be spent at any moment
+TTL_ADDRESS_TXS = 300
+TTL_LAYOUT = 86400 * 30       # graph layouts are a pure function of the edge set
+TTL_CLUSTER_RESULT = 600      # a finished /clusters run is reused for identical inputs
+L1_MAX = 4096                 # entry cap; bulky values (address histories, layouts, cluster runs) bypass L1
+CACHE_PRUNE_EVERY = 1000      # sqlite writes between sweeps of expired rows
+_L1 = {}                      # key -> (expires_ts, value)
+_cache_lock = threading.Lock()
+_cache_db = None
+_cache_writes = 0
+
+def _cache_prune(db):
+    db.execute("DELETE FROM cache WHERE expires < ?", (time.time(),))
+    db.commit()
+
+def _cache_conn():
+    global _cache_db
+    if _cache_db is None and CACHE_PATH:
+        _cache_db = sqlite3.connect(CACHE_PATH, check_same_thread=False)
+        _cache_db.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, expires REAL, value TEXT)")
+        _cache_prune(_cache_db)
+    return _cache_db
+
+def _l1_put(key, expires, val):
+    if key not in _L1 and len(_L1) >= L1_MAX:
+        _L1.pop(next(iter(_L1)))  # drop oldest insertion
+    _L1[key] = (expires, val)
+
+def _cache_get_json(key, l1=True):
+    """Return cached JSON value for key (L1 first, then sqlite) or None if missing/expired.
+    l1=False reads sqlite only and doesn't promote the value into L1 (for large values)."""
+    now = time.time()
+    with _cache_lock:
+        hit = _L1.get(key) if l1 else None
+        if hit and hit[0] > now:
+            return hit[1]
+        try:
+            db = _cache_conn()
+            row = db.execute("SELECT expires, value FROM cache WHERE key=?", (key,)).fetchone() if db else None
+        except sqlite3.Error:
+            row = None
+        if not row or row[0] <= now:
+            return None
+        val = _json_loads(row[1])
+        if l1:
+            _l1_put(key, row[0], val)
+        return val
+
+def _cache_set_json(key, val, ttl, l1=True):
+    global _cache_writes
+    expires = time.time() + ttl
+    with _cache_lock:
+        if l1:
+            _l1_put(key, expires, val)
+        try:
+            db = _cache_conn()
+            if db:
+                db.execute("INSERT OR REPLACE INTO cache (key, expires, value) VALUES (?,?,?)",
+                           (key, expires, _json_dumps(val)))
+                db.commit()
+                _cache_writes += 1
+                if _cache_writes % CACHE_PRUNE_EVERY == 0:
+                    _cache_prune(db)
+        except sqlite3.Error:
+            pass  # disk cache is best-effort; L1 still holds the value
+
+def _address_txs_stream(addr, max_pages):
+    """
+    Yield tx summaries for addr (newest first), following Esplora's
+    /address/:addr/txs/chain/:last_txid pagination for up to max_pages pages.
+    """
+    last = None
+    for _ in range(max_pages):
+        url = f"{ESPLORA}/address/{addr}/txs" + (f"/chain/{last}" if last else "")
+        page = _esplora_get(url, timeout=12)
+        if not page:
+            return
+        yield from page
+        if len(page) < 25:  # short page: end of history
+            return
+        last = page[-1].get("txid")
 
-# simple in-memory cache for address lookups during a run
-ADDRESS_TXS_CACHE = {}
 def _cached_address_txs(addr):
-    """Return list of tx summaries for addr from Esplora, cached per-run."""
-    if addr in ADDRESS_TXS_CACHE:
-        return ADDRESS_TXS_CACHE[addr]
+    """Return the first page of tx summaries for addr, cached (TTL_ADDRESS_TXS)."""
+    key = f"addrtx:{addr}"
+    res = _cache_get_json(key, l1=False)
+    if res is not None:
+        return res
     try:
-        r = requests.get(f"{ESPLORA}/address/{addr}/txs", timeout=12)
-        r.raise_for_status()
-        res = r.json() or []
+        res = list(_address_txs_stream(addr, max_pages=1))
     except Exception:
-        res = []
-    ADDRESS_TXS_CACHE[addr] = res
+        return []
+    _cache_set_json(key, res, TTL_ADDRESS_TXS, l1=False)
     return res
 
 
@@ -48,39 +225,122 @@ app.jinja_env.filters['basename'] = os.path.basename
 
 ### ----------------- Tracer helpers (same as before) -----------------
 def get_tx_json(txid):
-    url = f"{ESPLORA}/tx/{txid}"
-    r = requests.get(url, timeout=30)
-    r.raise_for_status()
-    return r.json()
+    key = f"tx:{txid}"
+    tx = _cache_get_json(key)
+    if tx is None:
+        tx = _esplora_get(f"{ESPLORA}/tx/{txid}")
+        confirmed = (tx.get("status") or {}).get("confirmed", False)
+        _cache_set_json(key, tx, TTL_TX if confirmed else TTL_TX_UNCONFIRMED)
+    return tx
 
 def get_outspends(txid):
-    url = f"{ESPLORA}/tx/{txid}/outspends"
-    r = requests.get(url, timeout=30)
-    r.raise_for_status()
-    return r.json()
+    key = f"os:{txid}"
+    outspends = _cache_get_json(key)
+    if outspends is None:
+        outspends = _esplora_get(f"{ESPLORA}/tx/{txid}/outspends")
+        # only a fully spent (and confirmed-spent, so no RBF replacement) set is final
+        final = all(o.get("spent") and (o.get("status") or {}).get("confirmed") for o in outspends)
+        _cache_set_json(key, outspends, TTL_OUTSPENDS if final else TTL_OUTSPENDS_PARTIAL)
+    return outspends
+
+def fetch_txs(txids, batch_size=BATCH):
+    """Fetch tx JSONs concurrently (at most batch_size in flight). Returns {txid: tx_json}."""
+    unique = list(dict.fromkeys(txids))
+    if not unique: return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(batch_size, len(unique)))) as ex:
+        return dict(zip(unique, ex.map(get_tx_json, unique)))
 
 class UnionFind:
-    def __init__(self): self.parent = {}
+    def __init__(self): self.parent = {}; self.rank = {}
     def find(self, a):
-        if a not in self.parent: self.parent[a] = a; return a
-        if self.parent[a] == a: return a
-        self.parent[a] = self.find(self.parent[a]); return self.parent[a]
+        parent=self.parent
+        if a not in parent: parent[a] = a; self.rank[a] = 0; return a
+        # iterative path halving: no recursion limit on long union chains
+        while parent[a] != a:
+            parent[a] = parent[parent[a]]; a = parent[a]
+        return a
     def union(self, a, b):
         ra=self.find(a); rb=self.find(b)
-        if ra!=rb: self.parent[rb]=ra
+        if ra==rb: return
+        if self.rank[ra]<self.rank[rb]: ra,rb=rb,ra
+        self.parent[rb]=ra
+        if self.rank[ra]==self.rank[rb]: self.rank[ra]+=1
     def groups(self):
-        out=defaultdict(list)
-        for k in list(self.parent.keys()): out[self.find(k)].append(k)
+        out={}; find=self.find
+        for k in self.parent: out.setdefault(find(k),[]).append(k)
         return out
 
+def common_input_components(input_lists):
+    """
+    Common-input-ownership clustering over per-tx input address lists. Returns
+    {address: component_id} for every address in a list of >= 2 inputs, in first-seen
+    order; addresses sharing an id are one cluster. Uses scipy's C connected_components
+    when installed, else UnionFind.
+    """
+    ids = {}; rows = []; cols = []
+    for addrs in input_lists:
+        if len(addrs) < 2: continue
+        base = ids.setdefault(addrs[0], len(ids))
+        for a in addrs[1:]:
+            rows.append(base); cols.append(ids.setdefault(a, len(ids)))
+    if not ids: return {}
+    if connected_components is not None:
+        n = len(ids)
+        graph = coo_matrix((np.ones(len(rows), dtype=np.int32), (rows, cols)), shape=(n, n))
+        _, labels = connected_components(graph, directed=False)
+        return dict(zip(ids, labels.tolist()))
+    uf = UnionFind()
+    for r, c in zip(rows, cols): uf.union(r, c)
+    return {a: uf.find(i) for a, i in ids.items()}
+
+HEURISTIC_MEMO_MAX = 4096
+
+def _memoize_by_txid(fn):
+    """
+    Memoize a per-tx heuristic on tx_json["txid"] (bounded, in-process). Only valid
+    for functions whose result depends on tx_json alone; results are shared between
+    callers, so treat them as read-only.
+    """
+    memo = {}
+    lock = threading.Lock()  # request, job and fetch threads share the memo; fn itself runs unlocked
+    @functools.wraps(fn)
+    def wrapper(tx_json, *args, **kwargs):
+        txid = tx_json.get("txid")
+        if txid is None:
+            return fn(tx_json, *args, **kwargs)
+        with lock:
+            hit = memo.get(txid)
+        if hit is None:
+            hit = fn(tx_json, *args, **kwargs)
+            with lock:
+                if txid not in memo and len(memo) >= HEURISTIC_MEMO_MAX:
+                    memo.pop(next(iter(memo)), None)
+                memo[txid] = hit
+        return hit
+    def cache_clear():
+        with lock:
+            memo.clear()
+    wrapper.cache_clear = cache_clear
+    return wrapper
+
+@_memoize_by_txid
+def _vout_soa(tx_json):
+    """
+    tx_json["vout"] as parallel columns (values int64 array, addresses, script types),
+    built once per txid and shared by the change, coinjoin and peel-proxy heuristics.
+    """
+    vs = tx_json.get("vout", [])
+    return (np.fromiter((int(v.get("value") or 0) for v in vs), dtype=np.int64, count=len(vs)),
+            [v.get("scriptpubkey_address") for v in vs], [v.get("scriptpubkey_type") for v in vs])
+
+@_memoize_by_txid
 def detect_coinjoin(tx_json):
     vin_count=len(tx_json.get("vin",[])); vout_count=len(tx_json.get("vout",[]))
     if vin_count>=5 and vout_count>=5:
-        values=[v.get("value",0) for v in tx_json.get("vout",[]) if v.get("value",0)>0]
-        if not values: return False,0.0
-        mean=sum(values)/len(values)
-        variance=sum((x-mean)**2 for x in values)/len(values)
-        sd=math.sqrt(variance); rel=sd/(mean+1e-9)
+        values=_vout_soa(tx_json)[0].astype(np.float64)
+        values=values[values>0]
+        if not values.size: return False,0.0
+        mean=values.mean(); sd=values.std(); rel=float(sd/(mean+1e-9))
         score=max(0.0,1.0-min(rel/0.05,1.0))
         return score>0.6,score
     return False,0.0
@@ -94,7 +354,7 @@ def change_candidate_scores(tx_json):
     vout_list=tx_json.get("vout",[])
     out_scores=[]
     majority_script=None
-    if vin_script_types: majority_script=max(set(vin_script_types), key=vin_script_types.count)
+    if vin_script_types: majority_script=Counter(vin_script_types).most_common(1)[0][0]
     max_in=max([vin.get("prevout",{}).get("value",0) for vin in tx_json.get("vin",[])] + [0])
     for idx,vout in enumerate(vout_list):
         score=0.0; addr=vout.get("scriptpubkey_address"); sval=vout.get("value",0)
@@ -106,70 +366,60 @@ def change_candidate_scores(tx_json):
     if len(positive)==1: positive[0]["score"]=min(1.0,positive[0]["score"]+0.15)
     return out_scores
 
-def add_bipartite_edges_for_tx(tx_json,bip_edges):
-    txid=tx_json["txid"]
+BIP_FIELDS=("type","from","to","sats","txid")
+
+def add_bipartite_edges_for_tx(tx_json):
+    """
+    Yield (type, from, to, sats, txid) edge tuples for one tx, in BIP_FIELDS order.
+    Address / txid strings are interned: they repeat across edges, projection and
+    UnionFind keys, so one shared object per value saves memory and hashing.
+    """
+    intern=sys.intern
+    txid=intern(tx_json["txid"]); tx_node=intern(f"tx:{txid}")
     for vin in tx_json.get("vin",[]):
         prev=vin.get("prevout") or {}
-        addr=prev.get("scriptpubkey_address") or "UNKNOWN_INPUT"
+        addr=intern(prev.get("scriptpubkey_address") or "UNKNOWN_INPUT")
         val=prev.get("value",0)
-        bip_edges.append({"type":"addr->tx","from":addr,"to":f"tx:{txid}","sats":val,"txid":txid})
+        yield ("addr->tx",addr,tx_node,val,txid)
     for idx,vout in enumerate(tx_json.get("vout",[])):
-        addr=vout.get("scriptpubkey_address") or f"NON_STD_VOUT_{idx}"
+        addr=intern(vout.get("scriptpubkey_address") or f"NON_STD_VOUT_{idx}")
         val=vout.get("value",0)
-        bip_edges.append({"type":"tx->addr","from":f"tx:{txid}","to":addr,"sats":val,"txid":txid})
-    time.sleep(SLEEP)
+        yield ("tx->addr",tx_node,addr,val,txid)
 
 def project_address_to_address(bip_edges):
-    tx_inputs=defaultdict(list); tx_outputs=defaultdict(list)
-    for e in bip_edges:
-        if e["type"]=="addr->tx": tx_inputs[e["txid"]].append((e["from"],e["sats"]))
-        else: tx_outputs[e["txid"]].append((e["to"],e["sats"]))
-    projected=[]
-    for txid in set(list(tx_inputs.keys())+list(tx_outputs.keys())):
-        inputs=tx_inputs.get(txid,[]); outputs=tx_outputs.get(txid,[])
-        total_in=sum([v for (_,v) in inputs]) or 1
-        for out_addr,out_sats in outputs:
-            for in_addr,in_sats in inputs:
-                share=(in_sats/total_in)*out_sats
-                if share<=0: continue
-                projected.append({"txid":txid,"from":in_addr,"to":out_addr,"sats":int(round(share))})
-    return projected
+    """Yield (txid, from_addr, to_addr, sats) value-share rows from bipartite edge tuples."""
+    # txid -> (in_addrs, in_sats, out_addrs, out_sats)
+    per_tx={}
+    for typ,frm,to,sats,txid in bip_edges:
+        g=per_tx.get(txid)
+        if g is None: g=per_tx[txid]=([],[],[],[])
+        if typ=="addr->tx": g[0].append(frm); g[1].append(sats)
+        else: g[2].append(to); g[3].append(sats)
+    for txid,(in_addrs,in_sats,out_addrs,out_sats) in per_tx.items():
+        if not in_addrs or not out_addrs: continue
+        ia=np.asarray(in_sats,dtype=np.float64); oa=np.asarray(out_sats,dtype=np.float64)
+        total_in=ia.sum() or 1
+        # share[j,i] = (in_i/total_in)*out_j for output j, input i (float64: sats products overflow int64)
+        share=np.multiply.outer(oa,ia/total_in)
+        oj,ii=np.nonzero(share>0)
+        sats=np.rint(share[oj,ii]).astype(np.int64)
+        for j,i,v in zip(oj.tolist(),ii.tolist(),sats.tolist()):
+            yield (txid,in_addrs[i],out_addrs[j],v)
 
 def sats_to_btc(sats): return sats/1e8
 
-def trace_peel_chain(txid,vout_index=0,max_hops=8):
-    chain=[]; cur_tx=txid; cur_vout=vout_index
-    for hop in range(max_hops):
-        try: outspends=get_outspends(cur_tx)
-        except Exception as e: chain.append({"error":f"failed_outspends:{e}"}); break
-        if cur_vout>=len(outspends): chain.append({"error":"vout_index_out_of_range"}); break
-        out=outspends[cur_vout]; spent=out.get("spent",False); value=out.get("value",0)
-        spent_txid=out.get("txid"); spent_vin=out.get("vin",None)
-        spent_addr=None
-        if spent and spent_txid:
-            try:
-                sp_tx=get_tx_json(spent_txid)
-                outs=sp_tx.get("vout",[])
-                if outs:
-                    candidate=max(outs,key=lambda o:o.get("value",0))
-                    spent_addr=candidate.get("scriptpubkey_address") or "NON_STD"
-            except Exception: spent_addr=None
-        chain.append({"from_tx":cur_tx,"from_vout":cur_vout,"value_sats":value,"spent":spent,"spent_in_tx":spent_txid,"spent_in_vin_index":spent_vin,"spent_addr":spent_addr})
-        if not spent or not spent_txid: break
-        cur_tx=spent_txid; cur_vout=0; time.sleep(SLEEP)
-    return chain
-
-def read_csv_preview(path, max_rows=500):
+def read_csv_preview(path, max_rows=PREVIEW_PAGE, offset=0):
     if not os.path.exists(path): return {"columns":[],"rows":[]}
-    rows=[]; cols=[]
     with open(path,newline='',encoding='utf-8') as fh:
         reader=csv.DictReader(fh)
         cols=reader.fieldnames or []
-        for i,r in enumerate(reader):
-            if i>=max_rows: break
-            rows.append(r)
+        rows=list(itertools.islice(reader,offset,offset+max_rows))
     return {"columns":cols,"rows":rows}
 
+def rows_preview(columns, rows, max_rows=500):
+    """read_csv_preview-shaped preview of in-memory row tuples (None shown blank, as csv.writer writes it)."""
+    return {"columns":list(columns),"rows":[{c:("" if v is None else v) for c,v in zip(columns,r)} for r in itertools.islice(rows,max_rows)]}
+
 def _truncated_label(s, left=12, right=8):
     if s is None: return ""
     if len(s) <= left + right + 3: return s
@@ -177,41 +427,75 @@ def _truncated_label(s, left=12, right=8):
 
 def process_txids(txid_list,outdir):
     os.makedirs(outdir,exist_ok=True)
-    bip_edges=[]; uf=UnionFind(); tx_flags=[]
-    for txid in txid_list:
-        txid=txid.strip()
-        if not txid: continue
-        tx = get_tx_json(txid)
-        cj_flag, cj_score = detect_coinjoin(tx)
-        # Use the richer change candidate detector (includes novelty/script/round heuristics)
-        change_scores = detect_change_candidates_for_tx(tx)
-        tx_flags.append({
-            "txid": txid,
-            "coinjoin": cj_flag,
-            "coinjoin_score": round(cj_score, 4),
-            "change_scores": change_scores
-        })
-
-        inputs=[]
-        for vin in tx.get("vin",[]):
-            prev=vin.get("prevout") or {}
-            addr=prev.get("scriptpubkey_address") or "UNKNOWN_INPUT"
-            inputs.append(addr)
-        if len(inputs)>=2:
-            base=inputs[0]
-            for other in inputs[1:]:
-                uf.union(base,other)
-        add_bipartite_edges_for_tx(tx,bip_edges)
-    projected=project_address_to_address(bip_edges)
+    uf=UnionFind(); tx_flags=[]
+    bip_edges=[]  # slim edge tuples, kept only for projection + graphs
+    txid_list=[sys.intern(t.strip()) for t in txid_list if t.strip()]
+    # fetch every tx up front (bounded concurrency) instead of one round-trip at a time
+    txs_by_id=fetch_txs(txid_list)
 
+    # edges are streamed to the CSV as each tx is processed
     bip_csv=os.path.join(outdir,"bipartite_edges.csv")
-    with open(bip_csv,"w",newline="",encoding='utf-8') as fh:
-        w=csv.DictWriter(fh,fieldnames=["type","from","to","sats","txid"]); w.writeheader()
-        for r in bip_edges: w.writerow(r)
+    with open(bip_csv,"w",newline="",encoding='utf-8',buffering=1<<20) as fh:
+        w=csv.writer(fh); w.writerow(BIP_FIELDS)
+        for txid in txid_list:
+            tx = txs_by_id[txid]
+            cj_flag, cj_score = detect_coinjoin(tx)
+            # Use the richer change candidate detector (includes novelty/script/round heuristics)
+            change_scores = detect_change_candidates_for_tx(tx)
+            tx_flags.append({
+                "txid": txid,
+                "coinjoin": cj_flag,
+                "coinjoin_score": cj_score,
+                "change_scores": change_scores
+            })
+
+            inputs=[]
+            for vin in tx.get("vin",[]):
+                prev=vin.get("prevout") or {}
+                addr=sys.intern(prev.get("scriptpubkey_address") or "UNKNOWN_INPUT")
+                inputs.append(addr)
+            if len(inputs)>=2:
+                base=inputs[0]
+                for other in inputs[1:]:
+                    uf.union(base,other)
+            for edge in add_bipartite_edges_for_tx(tx):
+                w.writerow(edge); bip_edges.append(edge)
+
+    projected=[]  # (from, to, sats) kept for the projected graph
     proj_csv=os.path.join(outdir,"evidence_address_to_address.csv")
-    with open(proj_csv,"w",newline="",encoding='utf-8') as fh:
-        w=csv.DictWriter(fh,fieldnames=["txid","from","to","sats","btc"]); w.writeheader()
-        for r in projected: w.writerow({"txid":r["txid"],"from":r["from"],"to":r["to"],"sats":r["sats"],"btc":sats_to_btc(r["sats"])})
+    with open(proj_csv,"w",newline="",encoding='utf-8',buffering=1<<20) as fh:
+        w=csv.writer(fh); w.writerow(["txid","from","to","sats","btc"])
+        for txid,a,b,sats in project_address_to_address(bip_edges):
+            w.writerow((txid,a,b,sats,sats_to_btc(sats))); projected.append((a,b,sats))
+    # lay out both graphs here, then render the short-label PNGs in worker processes
+    # while the remaining CSVs are written. Full labels are drawn in the browser from
+    # the JSON dumps (same positions), which beats an unreadable 150dpi PNG.
+    bip_png=os.path.join(outdir,"bipartite_graph.png"); bip_json=os.path.join(outdir,"bipartite_graph.json")
+    proj_png=os.path.join(outdir,"projected_graph.png"); proj_json=os.path.join(outdir,"projected_graph.json")
+    renders=[]
+    try:
+        # flat (from, to) -> BTC map; a repeated pair keeps the last weight, as DiGraph.add_edge did
+        bip_w={(a,b):sats/1e8 for _,a,b,sats,_ in bip_edges}
+        # positions once for consistency/appearance
+        pos = _spring_layout_cached(bip_w.keys(), k=0.7, iterations=120)
+        bip_graph_edges=[(a,b,w) for (a,b),w in bip_w.items()]
+        renders.append(("Graph draw error:", _render_pool().submit(_render_graph, bip_png, bip_graph_edges, pos, "bipartite")))
+        _write_graph_json(bip_json, bip_graph_edges, pos)
+    except Exception as e:
+        print("Graph draw error:",e)
+
+    try:
+        # sum projected BTC per address pair in a flat dict rather than through DiGraph lookups
+        proj_w={}
+        for a,b,sats in projected:
+            k=(a,b); proj_w[k]=proj_w.get(k,0.0)+sats_to_btc(sats)
+        pos2 = _spring_layout_cached(proj_w.keys(), k=0.6, iterations=150)
+        proj_graph_edges=[(a,b,w) for (a,b),w in proj_w.items()]
+        renders.append(("Projected graph draw error:", _render_pool().submit(_render_graph, proj_png, proj_graph_edges, pos2, "projected")))
+        _write_graph_json(proj_json, proj_graph_edges, pos2)
+    except Exception as e:
+        print("Projected graph draw error:",e)
+
     clusters=uf.groups()
     cl_csv=os.path.join(outdir,"clusters.csv")
     with open(cl_csv,"w",newline="",encoding='utf-8') as fh:
@@ -221,92 +505,116 @@ def process_txids(txid_list,outdir):
     flags_csv=os.path.join(outdir,"tx_flags.csv")
     with open(flags_csv,"w",newline="",encoding='utf-8') as fh:
         w=csv.writer(fh); w.writerow(["txid","coinjoin","coinjoin_score","change_scores_json"])
-        for t in tx_flags: w.writerow([t["txid"],t["coinjoin"],t["coinjoin_score"],str(t["change_scores"])])
-
-    # bipartite graph (two versions: short and full labels)
-    try:
-        G=nx.DiGraph()
-        for e in bip_edges:
-            G.add_node(e["from"]); G.add_node(e["to"])
-            wgt=e["sats"]/1e8
-            G.add_edge(e["from"],e["to"],weight=wgt)
-        # positions once for consistency/appearance
-        pos = nx.spring_layout(G, k=0.7, iterations=120)
-
-        # SHORT labels (truncated)
-        plt.figure(figsize=(12,9))
-        ns=[200+250*(G.degree(n)) for n in G.nodes()]
-        nx.draw_networkx_nodes(G,pos,node_size=ns,node_color="#a6d8ff")
-        nx.draw_networkx_edges(G,pos,arrowstyle="-|>",arrowsize=10,width=1)
-        labels_short = {n: _truncated_label(n) for n in G.nodes()}
-        nx.draw_networkx_labels(G,pos,labels_short,font_size=7)
-        edge_labels = {(u,v):f"{d['weight']:.6f}" for u,v,d in G.edges(data=True)}
-        nx.draw_networkx_edge_labels(G,pos,edge_labels=edge_labels,font_size=7)
-        plt.title("Bipartite Address ↔ TX")
-        plt.axis("off")
-        bip_png = os.path.join(outdir,"bipartite_graph.png")
-        plt.tight_layout(); plt.savefig(bip_png,dpi=150); plt.close()
-
-        # FULL labels
-        plt.figure(figsize=(12,9))
-        nx.draw_networkx_nodes(G,pos,node_size=ns,node_color="#a6d8ff")
-        nx.draw_networkx_edges(G,pos,arrowstyle="-|>",arrowsize=10,width=1)
-        labels_full = {n: n for n in G.nodes()}
-        nx.draw_networkx_labels(G,pos,labels_full,font_size=7)
-        nx.draw_networkx_edge_labels(G,pos,edge_labels=edge_labels,font_size=7)
-        plt.title("Bipartite Address ↔ TX — Full labels")
-        plt.axis("off")
-        bip_png_full = os.path.join(outdir,"bipartite_graph_full.png")
-        plt.tight_layout(); plt.savefig(bip_png_full,dpi=150); plt.close()
-
-    except Exception as e:
-        print("Graph draw error:",e)
-
-    # projected graph (two versions)
-    try:
-        G2=nx.DiGraph()
-        for p in projected:
-            a=p["from"]; b=p["to"]; w=sats_to_btc(p["sats"])
-            if G2.has_edge(a,b): G2[a][b]["weight"]+=w
-            else: G2.add_edge(a,b,weight=w)
-        pos2 = nx.spring_layout(G2, k=0.6, iterations=150)
-        ns2=[200+250*(G2.degree(n)) for n in G2.nodes()]
-
-        # SHORT
-        plt.figure(figsize=(12,9))
-        nx.draw_networkx_nodes(G2,pos2,node_size=ns2,node_color="#b7f4c6")
-        nx.draw_networkx_edges(G2,pos2,arrowstyle="-|>",arrowsize=10,width=1.2)
-        labels2_short = {n: _truncated_label(n) for n in G2.nodes()}
-        nx.draw_networkx_labels(G2,pos2,labels2_short,font_size=8)
-        edge_labels2 = {(u,v):f"{d['weight']:.6f}" for u,v,d in G2.edges(data=True)}
-        nx.draw_networkx_edge_labels(G2,pos2,edge_labels=edge_labels2,font_size=7)
-        proj_png = os.path.join(outdir,"projected_graph.png")
-        plt.title("Projected Address → Address (BTC)")
-        plt.axis("off")
-        plt.tight_layout(); plt.savefig(proj_png,dpi=150); plt.close()
-
-        # FULL
-        plt.figure(figsize=(12,9))
-        nx.draw_networkx_nodes(G2,pos2,node_size=ns2,node_color="#b7f4c6")
-        nx.draw_networkx_edges(G2,pos2,arrowstyle="-|>",arrowsize=10,width=1.2)
-        labels2_full = {n: n for n in G2.nodes()}
-        nx.draw_networkx_labels(G2,pos2,labels2_full,font_size=8)
-        nx.draw_networkx_edge_labels(G2,pos2,edge_labels=edge_labels2,font_size=7)
-        proj_png_full = os.path.join(outdir,"projected_graph_full.png")
-        plt.title("Projected Address → Address — Full labels")
-        plt.axis("off")
-        plt.tight_layout(); plt.savefig(proj_png_full,dpi=150); plt.close()
+        for t in tx_flags: w.writerow([t["txid"],t["coinjoin"],round(t["coinjoin_score"],4),str(t["change_scores"])])
 
-    except Exception as e:
-        print("Projected graph draw error:",e)
+    errors={fut:msg for msg,fut in renders}
+    for fut in as_completed(errors):
+        try: fut.result()
+        except BrokenProcessPool as e: print(errors[fut],e); _reset_render_pool()
+        except Exception as e: print(errors[fut],e)
 
     return {
         "bip":bip_csv,"proj":proj_csv,"clusters":cl_csv,"flags":flags_csv,
-        "bip_png":os.path.join(outdir,"bipartite_graph.png"),
-        "bip_png_full":os.path.join(outdir,"bipartite_graph_full.png"),
-        "proj_png":os.path.join(outdir,"projected_graph.png"),
-        "proj_png_full":os.path.join(outdir,"projected_graph_full.png")
+        "bip_png":bip_png,
+        "bip_json":bip_json,
+        "proj_png":proj_png,
+        "proj_json":proj_json
+    }
+
+### -------------------- Graph rendering (runs in worker processes) --------------------
+GRAPH_STYLES = {
+    "bipartite": {"title":"Bipartite Address ↔ TX", "color":"#a6d8ff", "font_size":7, "width":1},
+    "projected": {"title":"Projected Address → Address (BTC)", "color":"#b7f4c6", "font_size":8, "width":1.2},
+}
+_RENDER_POOL = None
+
+def _render_pool():
+    """Lazily start the shared 2-worker render pool ('spawn': safe alongside request threads)."""
+    global _RENDER_POOL
+    if _RENDER_POOL is None:
+        _RENDER_POOL = ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("spawn"))
+    return _RENDER_POOL
+
+def _reset_render_pool():
+    """Drop a broken pool (e.g. a worker was killed) so the next run starts a fresh one."""
+    global _RENDER_POOL
+    pool, _RENDER_POOL = _RENDER_POOL, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def _spring_layout_cached(edges, k, iterations, seed=42):
+    """
+    Seeded spring layout of the graph formed by `edges`, cached by edge-set hash so
+    re-analysing the same txids skips Fruchterman-Reingold entirely.
+    Returns {node: (x, y)}.
+    """
+    edges = sorted(set(edges))
+    engine = "igraph" if igraph else "nx"
+    key = "layout:" + hashlib.sha256(json.dumps([engine, edges, k, iterations, seed]).encode()).hexdigest()
+    hit = _cache_get_json(key, l1=False)
+    if hit is not None:
+        return {n: tuple(xy) for n, xy in hit.items()}
+    if igraph:
+        nodes, coords = _igraph_fr_layout(edges, iterations, seed)
+    else:
+        G = nx.DiGraph(); G.add_edges_from(edges)
+        layout = nx.spring_layout(G, k=k, iterations=iterations, seed=seed)
+        nodes, coords = list(layout), list(layout.values())
+    pos = {n: (float(xy[0]), float(xy[1])) for n, xy in zip(nodes, coords)}
+    _cache_set_json(key, pos, TTL_LAYOUT, l1=False)  # per-node coordinates: kept out of L1
+    return pos
+
+_igraph_rng_lock = threading.Lock()
+
+def _igraph_fr_layout(edges, iterations, seed):
+    """Fruchterman-Reingold via igraph, seeded for determinism and rescaled to [-1, 1] like spring_layout."""
+    nodes = list(dict.fromkeys(n for e in edges for n in e))
+    if not nodes:
+        return [], []
+    idx = {n: i for i, n in enumerate(nodes)}
+    g = igraph.Graph(n=len(nodes), edges=[(idx[u], idx[v]) for u, v in edges], directed=False)
+    # igraph's RNG is process-global: seed it for this call only, then restore the default
+    with _igraph_rng_lock:
+        igraph.set_random_number_generator(random.Random(seed))
+        try:
+            coords = g.layout_fruchterman_reingold(niter=iterations).coords
+        finally:
+            igraph.set_random_number_generator(random)
+    return nodes, nx.rescale_layout(np.asarray(coords, dtype=np.float64))
+
+def _write_graph_json(path, edges, pos):
+    """Dump nodes (with layout position + degree) and weighted edges for the browser-side full-label view."""
+    deg = defaultdict(int)
+    for u, v, _ in edges:
+        deg[u] += 1; deg[v] += 1
+    data = {
+        "nodes": [{"id": n, "x": xy[0], "y": xy[1], "deg": deg[n]} for n, xy in pos.items()],
+        "edges": [{"from": u, "to": v, "w": w} for u, v, w in edges],
     }
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write(_json_dumps(data))
+
+def _render_graph(path, edges, pos, kind):
+    """
+    Draw one short-label graph PNG from picklable primitives: (u, v, weight_btc)
+    edges and a precomputed {node: (x, y)} layout.
+    """
+    style = GRAPH_STYLES[kind]
+    G=nx.DiGraph(); G.add_weighted_edges_from(edges)
+    # fixed margins instead of tight_layout(), which re-measures every artist per render
+    fig=plt.figure(figsize=(12,9),constrained_layout=False)
+    fig.subplots_adjust(left=0.02,right=0.98,top=0.95,bottom=0.02)
+    ns=[200+250*(G.degree(n)) for n in G.nodes()]
+    nx.draw_networkx_nodes(G,pos,node_size=ns,node_color=style["color"])
+    nx.draw_networkx_edges(G,pos,arrowstyle="-|>",arrowsize=10,width=style["width"])
+    labels = {n: _truncated_label(n) for n in G.nodes()}
+    nx.draw_networkx_labels(G,pos,labels,font_size=style["font_size"])
+    edge_labels = {(u,v):f"{d['weight']:.6f}" for u,v,d in G.edges(data=True)}
+    nx.draw_networkx_edge_labels(G,pos,edge_labels=edge_labels,font_size=7)
+    plt.title(style["title"])
+    plt.axis("off")
+    # on-screen preview only (full labels are drawn in the browser), so screen dpi is enough
+    fig.savefig(path,dpi=96,bbox_inches=None,pad_inches=0); plt.close(fig)
 
 ### -------------------- Templates (RESULT_HTML includes toggle) --------------------
 INDEX_HTML = """
@@ -322,6 +630,8 @@ INDEX_HTML = """
     textarea, input[type=text], input[type=file] { width:100%; padding:10px; border:1px solid #e6eef8; border-radius:8px; }
     button { background:#0b6ff2; color:#fff; border:none; padding:10px 14px; border-radius:8px; cursor:pointer; font-weight:600; }
     small.muted { color:#7c88a1; }
+    .flash { padding:10px 12px; border-radius:8px; margin-bottom:10px; background:#eef6ff; color:#0b1726; }
+    .flash.error { background:#fff1ec; color:#c05621; border:1px solid #fbd5c5; }
     footer { text-align:center; color:#8892a6; font-size:13px; margin-top:14px; }
   </style>
 </head>
@@ -329,6 +639,9 @@ INDEX_HTML = """
   <div class="card">
     <h2>UTXO Tracer</h2>
     <p class="muted">Paste one or more BTC txids (one per line) or upload a text file. Results include graphs, tables and downloadable CSVs.</p>
+    {% for category, msg in get_flashed_messages(with_categories=true) %}
+      <div class="flash {{ category }}">{{ msg }}</div>
+    {% endfor %}
     <form method="post" action="/analyze" enctype="multipart/form-data">
       <label><strong>TXIDs (one per line)</strong></label>
       <textarea name="txids" rows="6" placeholder="paste txids here"></textarea>
@@ -377,12 +690,14 @@ RESULT_HTML = """
     .csv-table th,.csv-table td{border:1px solid #f0f4fb;padding:8px 10px;text-align:left;vertical-align:top}
     .csv-table th{position:sticky;top:0;background:#fbfdff;font-weight:700}
     img.graph{max-width:100%;border-radius:8px;border:1px solid #eef6ff}
+    .graph-net{height:680px;border-radius:8px;border:1px solid #eef6ff}
     .toggle { display:flex; align-items:center; gap:10px; margin-bottom:10px }
     .toggle input { transform:scale(1.1); }
     a.small {color:#0b6ff2;font-weight:600}
   </style>
 </head>
 <body>
+  <script src="https://unpkg.com/vis-network@9.1.9/standalone/umd/vis-network.min.js"></script>
   <div class="container">
     <div class="header">
       <div>
@@ -413,9 +728,9 @@ RESULT_HTML = """
           <li><a class="small" href="{{ url_for('download', run_id=run_id, filename=paths['clusters']|basename) }}">clusters.csv</a></li>
           <li><a class="small" href="{{ url_for('download', run_id=run_id, filename=paths['flags']|basename) }}">tx_flags.csv</a></li>
           <li><a class="small" href="{{ url_for('download', run_id=run_id, filename=paths['bip_png']|basename) }}">bipartite_graph (short labels).png</a></li>
-          <li><a class="small" href="{{ url_for('download', run_id=run_id, filename=paths['bip_png_full']|basename) }}">bipartite_graph (full labels).png</a></li>
+          <li><a class="small" href="{{ url_for('download', run_id=run_id, filename=paths['bip_json']|basename) }}">bipartite_graph.json</a> (nodes, positions, edges)</li>
           <li><a class="small" href="{{ url_for('download', run_id=run_id, filename=paths['proj_png']|basename) }}">projected_graph (short labels).png</a></li>
-          <li><a class="small" href="{{ url_for('download', run_id=run_id, filename=paths['proj_png_full']|basename) }}">projected_graph (full labels).png</a></li>
+          <li><a class="small" href="{{ url_for('download', run_id=run_id, filename=paths['proj_json']|basename) }}">projected_graph.json</a> (nodes, positions, edges)</li>
         </ul>
       </div>
     </div>
@@ -423,28 +738,26 @@ RESULT_HTML = """
     <div id="bipartite_graph" class="panel tab-content" style="display:none">
       <div class="toggle">
         <label><input type="checkbox" id="bip_full_toggle"> Show full labels</label>
-        <div style="color:#66788f;font-size:13px">Toggle to show full addresses / txids on the graph (may be crowded).</div>
+        <div style="color:#66788f;font-size:13px">Toggle to show full addresses / txids in an interactive view (zoom / drag to inspect).</div>
       </div>
-      <img id="bip_img" class="graph" src="{{ url_for('download', run_id=run_id, filename=paths['bip_png']|basename) }}"
-           data-short="{{ url_for('download', run_id=run_id, filename=paths['bip_png']|basename) }}"
-           data-full="{{ url_for('download', run_id=run_id, filename=paths['bip_png_full']|basename) }}"
-           alt="Bipartite graph" />
+      <img id="bip_img" class="graph" src="{{ url_for('download', run_id=run_id, filename=paths['bip_png']|basename) }}" alt="Bipartite graph" />
+      <div id="bip_net" class="graph-net" style="display:none"
+           data-json="{{ url_for('download', run_id=run_id, filename=paths['bip_json']|basename) }}" data-color="#a6d8ff"></div>
     </div>
 
     <div id="projected_graph" class="panel tab-content" style="display:none">
       <div class="toggle">
         <label><input type="checkbox" id="proj_full_toggle"> Show full labels</label>
-        <div style="color:#66788f;font-size:13px">Toggle to show full addresses / txids on the graph (may be crowded).</div>
+        <div style="color:#66788f;font-size:13px">Toggle to show full addresses / txids in an interactive view (zoom / drag to inspect).</div>
       </div>
-      <img id="proj_img" class="graph" src="{{ url_for('download', run_id=run_id, filename=paths['proj_png']|basename) }}"
-           data-short="{{ url_for('download', run_id=run_id, filename=paths['proj_png']|basename) }}"
-           data-full="{{ url_for('download', run_id=run_id, filename=paths['proj_png_full']|basename) }}"
-           alt="Projected graph" />
+      <img id="proj_img" class="graph" src="{{ url_for('download', run_id=run_id, filename=paths['proj_png']|basename) }}" alt="Projected graph" />
+      <div id="proj_net" class="graph-net" style="display:none"
+           data-json="{{ url_for('download', run_id=run_id, filename=paths['proj_json']|basename) }}" data-color="#b7f4c6"></div>
     </div>
 
     <div id="bip_table" class="panel tab-content" style="display:none">
       <h3>Bipartite edges (preview)</h3>
-      <div class="table-wrap">
+      <div class="table-wrap" data-src="{{ url_for('preview', run_id=run_id, name=paths['bip']|basename) }}">
         {% if csvs.bip.columns %}
           <table class="csv-table"><thead><tr>{% for c in csvs.bip.columns %}<th>{{ c }}</th>{% endfor %}</tr></thead>
           <tbody>{% for row in csvs.bip.rows %}<tr>{% for c in csvs.bip.columns %}<td>{{ row[c] }}</td>{% endfor %}</tr>{% endfor %}</tbody></table>
@@ -454,7 +767,7 @@ RESULT_HTML = """
 
     <div id="proj_table" class="panel tab-content" style="display:none">
       <h3>Projected address→address (preview)</h3>
-      <div class="table-wrap">
+      <div class="table-wrap" data-src="{{ url_for('preview', run_id=run_id, name=paths['proj']|basename) }}">
         {% if csvs.proj.columns %}
           <table class="csv-table"><thead><tr>{% for c in csvs.proj.columns %}<th>{{ c }}</th>{% endfor %}</tr></thead>
           <tbody>{% for row in csvs.proj.rows %}<tr>{% for c in csvs.proj.columns %}<td>{{ row[c] }}</td>{% endfor %}</tr>{% endfor %}</tbody></table>
@@ -464,7 +777,7 @@ RESULT_HTML = """
 
     <div id="clusters_table" class="panel tab-content" style="display:none">
       <h3>Clusters (preview)</h3>
-      <div class="table-wrap">
+      <div class="table-wrap" data-src="{{ url_for('preview', run_id=run_id, name=paths['clusters']|basename) }}">
         {% if csvs.clusters.columns %}
           <table class="csv-table"><thead><tr>{% for c in csvs.clusters.columns %}<th>{{ c }}</th>{% endfor %}</tr></thead>
           <tbody>{% for row in csvs.clusters.rows %}<tr>{% for c in csvs.clusters.columns %}<td>{{ row[c] }}</td>{% endfor %}</tr>{% endfor %}</tbody></table>
@@ -474,7 +787,7 @@ RESULT_HTML = """
 
     <div id="flags_table" class="panel tab-content" style="display:none">
       <h3>Transaction flags (preview)</h3>
-      <div class="table-wrap">
+      <div class="table-wrap" data-src="{{ url_for('preview', run_id=run_id, name=paths['flags']|basename) }}">
         {% if csvs.flags.columns %}
           <table class="csv-table"><thead><tr>{% for c in csvs.flags.columns %}<th>{{ c }}</th>{% endfor %}</tr></thead>
           <tbody>{% for row in csvs.flags.rows %}<tr>{% for c in csvs.flags.columns %}<td>{{ row[c] }}</td>{% endfor %}</tr>{% endfor %}</tbody></table>
@@ -498,30 +811,58 @@ RESULT_HTML = """
     });
   });
 
-  // Graph label toggles
-  const bipToggle = document.getElementById('bip_full_toggle');
-  const bipImg = document.getElementById('bip_img');
-  if (bipToggle) {
-    bipToggle.addEventListener('change', function(){
-      bipImg.src = this.checked ? bipImg.getAttribute('data-full') : bipImg.getAttribute('data-short');
+  // Graph label toggles: full labels are drawn client-side from the pre-laid-out JSON
+  function fullLabelToggle(toggleId, imgId, netId) {
+    const toggle = document.getElementById(toggleId);
+    const img = document.getElementById(imgId);
+    const box = document.getElementById(netId);
+    if (!toggle || !img || !box) return;
+    let net = null;
+    toggle.addEventListener('change', function(){
+      img.style.display = this.checked ? 'none' : '';
+      box.style.display = this.checked ? 'block' : 'none';
+      if (!this.checked || net) return;
+      fetch(box.getAttribute('data-json')).then(r => r.json()).then(g => {
+        const S = 600, color = box.getAttribute('data-color');
+        const nodes = g.nodes.map(n => ({id:n.id, label:n.id, title:n.id, x:n.x*S, y:-n.y*S,
+                                         shape:'dot', size:6+3*n.deg, color:color, font:{size:11}}));
+        const edges = g.edges.map(e => ({from:e.from, to:e.to, label:e.w.toFixed(6), arrows:'to',
+                                         font:{size:9, align:'middle'}}));
+        net = new vis.Network(box, {nodes:nodes, edges:edges}, {physics:false, interaction:{hover:true}});
+      });
     });
   }
-  const projToggle = document.getElementById('proj_full_toggle');
-  const projImg = document.getElementById('proj_img');
-  if (projToggle) {
-    projToggle.addEventListener('change', function(){
-      projImg.src = this.checked ? projImg.getAttribute('data-full') : projImg.getAttribute('data-short');
+  fullLabelToggle('bip_full_toggle', 'bip_img', 'bip_net');
+  fullLabelToggle('proj_full_toggle', 'proj_img', 'proj_net');
+
+  // CSV previews: the first page is inlined, later pages are fetched as the table is scrolled
+  const PAGE = {{ page }};
+  document.querySelectorAll('.table-wrap[data-src]').forEach(wrap => {
+    const body = wrap.querySelector('tbody');
+    if (!body) return;
+    let offset = body.rows.length, busy = false, done = offset < PAGE;
+    wrap.addEventListener('scroll', function(){
+      if (busy || done || wrap.scrollTop + wrap.clientHeight < wrap.scrollHeight - 40) return;
+      busy = true;
+      fetch(wrap.getAttribute('data-src') + '?offset=' + offset + '&limit=' + PAGE).then(r => r.json()).then(d => {
+        d.rows.forEach(row => { const tr = body.insertRow(); row.forEach(v => { tr.insertCell().textContent = v; }); });
+        offset += d.rows.length; done = d.rows.length < PAGE; busy = false;
+      }).catch(() => { busy = false; });
     });
-  }
+  });
 </script>
 </body>
 </html>
 """
 
+# compiled once at import; render_template_string would re-parse the source on every request
+_INDEX_TMPL = app.jinja_env.from_string(INDEX_HTML)
+_RESULT_TMPL = app.jinja_env.from_string(RESULT_HTML)
+
 ### -------------------- Routes --------------------
 @app.route("/")
 def index():
-    return render_template_string(INDEX_HTML)
+    return _INDEX_TMPL.render()
 
 @app.route("/analyze", methods=["POST"])
 def analyze():
@@ -529,24 +870,61 @@ def analyze():
     if text: txs.extend([l.strip() for l in text.splitlines() if l.strip()])
     f=request.files.get("txfile")
     if f:
-        content=f.read().decode(errors="ignore")
-        txs.extend([l.strip() for l in content.splitlines() if l.strip()])
+        # stream the upload line by line; stop reading as soon as the cap is exceeded
+        for line in io.TextIOWrapper(f.stream, encoding="utf-8", errors="ignore"):
+            line=line.strip()
+            if line: txs.append(line)
+            if len(txs)>MAX_TXIDS: break
     if not txs:
         flash("No txids provided","error"); return redirect(url_for("index"))
+    if len(txs)>MAX_TXIDS:
+        flash(f"Too many txids (limit is {MAX_TXIDS}); split the list into smaller runs","error"); return redirect(url_for("index"))
     run_id=uuid.uuid4().hex[:12]; outdir=os.path.join(OUTPUT_ROOT,run_id)
     try:
         paths=process_txids(txs,outdir)
     except Exception as e:
         if os.path.isdir(outdir): shutil.rmtree(outdir, ignore_errors=True)
         flash(f"Processing failed: {e}","error"); return redirect(url_for("index"))
-    csvs={"bip":read_csv_preview(paths['bip'], max_rows=500),"proj":read_csv_preview(paths['proj'],max_rows=500),"clusters":read_csv_preview(paths['clusters'],max_rows=500),"flags":read_csv_preview(paths['flags'],max_rows=500)}
-    return render_template_string(RESULT_HTML, run_id=run_id, paths=paths, label=label, csvs=csvs)
+    csvs={k:read_csv_preview(paths[k]) for k in ("bip","proj","clusters","flags")}
+    return _RESULT_TMPL.render(run_id=run_id, paths=paths, label=label, csvs=csvs, page=PREVIEW_PAGE)
+
+def _gzip_stream(path, chunk=1<<16):
+    """Yield the file at path gzip-compressed in 64 KiB reads (level 1: most of the size win for little CPU)."""
+    z=zlib.compressobj(1, zlib.DEFLATED, 31)  # wbits 31 -> gzip container
+    with open(path,"rb") as fh:
+        for block in iter(lambda: fh.read(chunk), b""):
+            out=z.compress(block)
+            if out: yield out
+    yield z.flush()
+
+def _run_dir(run_id):
+    """Path of the run directory run_id directly under OUTPUT_ROOT, or None (safe_join rejects "..")."""
+    run_dir=safe_join(OUTPUT_ROOT, run_id) if run_id not in ("", ".") and run_id==os.path.basename(run_id) else None
+    return run_dir if run_dir and os.path.isdir(run_dir) else None
 
 @app.route("/download/<run_id>/<filename>")
 def download(run_id, filename):
-    outdir=os.path.join(OUTPUT_ROOT, run_id)
-    if not os.path.isdir(outdir): return "Run not found", 404
-    return send_from_directory(outdir, filename, as_attachment=False)
+    outdir=_run_dir(run_id)
+    if not outdir: return "Run not found", 404
+    if filename!=os.path.basename(filename) or not os.path.isfile(os.path.join(outdir, filename)): return "Not found", 404
+    # CSV exports compress ~5-10x; stream them gzipped when the client accepts it
+    if filename.endswith(".csv") and request.accept_encodings["gzip"]:
+        return Response(_gzip_stream(os.path.join(outdir, filename)), mimetype="text/csv",
+                        headers={"Content-Encoding":"gzip","Vary":"Accept-Encoding"})
+    # absolute: Flask resolves a relative directory against app.root_path, not the cwd OUTPUT_ROOT is relative to
+    return send_from_directory(os.path.abspath(outdir), filename, as_attachment=False)
+
+@app.route("/preview/<run_id>/<name>")
+def preview(run_id, name):
+    """One page of a run's CSV as JSON rows (lists in column order) for the lazy-loading tables."""
+    if name!=os.path.basename(name) or not name.endswith(".csv"): return "Not found", 404
+    run_dir=_run_dir(run_id)
+    if not run_dir: return "Not found", 404
+    path=os.path.join(run_dir, name)
+    if not os.path.isfile(path): return "Not found", 404
+    offset=max(0,request.args.get("offset",0,type=int)); limit=min(max(1,request.args.get("limit",PREVIEW_PAGE,type=int)),500)
+    p=read_csv_preview(path, max_rows=limit, offset=offset)
+    return jsonify({"columns":p["columns"],"rows":[[r.get(c,"") for c in p["columns"]] for r in p["rows"]]})
 
 
 # -------------------- Peel Chain Analysis: new route & helpers --------------------
@@ -554,7 +932,6 @@ def download(run_id, filename):
 # -------------------- Peel Chain Analysis: new route & helpers (REPLACE existing peel section) --------------------
 
 from math import isfinite
-import io
 
 def compute_peel_score(peel_chain):
     """
@@ -649,15 +1026,134 @@ def compute_peel_score(peel_chain):
     score = max(0.0, min(1.0, score))
 
     details.update({
-        "monotonicity": round(monotonicity, 3),
-        "ratio_stability": round(ratio_stability, 3),
-        "small_peel_presence": round(small_peel_presence, 3),
-        "hop_factor": round(hop_factor, 3),
-        "raw_ratios": [round(r, 4) for r in ratios],
+        "monotonicity": monotonicity,
+        "ratio_stability": ratio_stability,
+        "small_peel_presence": small_peel_presence,
+        "hop_factor": hop_factor,
+        "raw_ratios": ratios,
         "weights": {"monotonic": w_mon, "ratio": w_ratio, "small": w_small, "hop": w_hop}
     })
     return score, details
 
+def interpret_peel_score(score, likely=0.75, possible=0.45):
+    """Map a compute_peel_score score to its label (thresholds adjustable)."""
+    if score >= likely:
+        return "Likely peel chain"
+    if score >= possible:
+        return "Possible peel chain"
+    return "No clear peel chain"
+
+def _hop_fetch(txid):
+    """
+    Fetch outspends and tx JSON for txid concurrently. Returns (outspends, tx_json);
+    tx_json is None if that lookup failed (outspends errors propagate).
+    """
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        f_os = ex.submit(get_outspends, txid)
+        f_tx = ex.submit(get_tx_json, txid)
+        outspends = f_os.result()
+        try:
+            tx_json = f_tx.result()
+        except Exception:
+            tx_json = None
+    return outspends, tx_json
+
+def _peel_hop(cur_tx, cur_vout, force_vout=False, last_hop=False):
+    """
+    Resolve one peel-chain hop (cur_tx:cur_vout). Returns (hop_record, next_txid),
+    next_txid being the spending tx to follow, or None where the chain ends.
+    last_hop=True skips prefetching the spending tx's outspends (no hop will read them).
+    """
+    try:
+        # outspends + the tx itself in one round-trip; the tx is only read for value fallback
+        outspends, tx_json = _hop_fetch(cur_tx)
+    except Exception as e:
+        return {"from_tx": cur_tx, "from_vout": cur_vout, "value_sats": None, "value_source": "outspends_error", "error": f"outspends_failed:{e}"}, None
+
+    if cur_vout >= len(outspends):
+        return {"from_tx": cur_tx, "from_vout": cur_vout, "value_sats": None, "value_source": "vout_index_out_of_range", "error": "vout_index_out_of_range"}, None
+
+    out = outspends[cur_vout]
+    # store raw outspend for debugging transparency
+    hop_record = {"from_tx": cur_tx, "from_vout": cur_vout, "raw_outspend": out}
+
+    sp_tx = None  # the spending tx, fetched once and shared by the proxy-value and spent_addr steps
+    if out.get("spent") and out.get("txid") and last_hop:
+        try:
+            sp_tx = get_tx_json(out["txid"])
+        except Exception:
+            sp_tx = None
+    elif out.get("spent") and out.get("txid"):
+        # pipeline: the spending tx is also the next hop; fetch its JSON and outspends
+        # together now so the whole next hop is served from the cache
+        try:
+            _, sp_tx = _hop_fetch(out["txid"])
+        except Exception:
+            try:
+                sp_tx = get_tx_json(out["txid"])  # only its outspends failed; next hop records that
+            except Exception:
+                sp_tx = None
+
+    # try value from outspends
+    value = out.get("value") if isinstance(out.get("value"), (int, float)) else None
+    value_source = None
+    if force_vout or not value:
+        # fallback: tx.vout (prefetched alongside outspends)
+        if tx_json is None:
+            value_source = "tx_vout_error"
+        else:
+            vouts = tx_json.get("vout", [])
+            if cur_vout < len(vouts):
+                value = vouts[cur_vout].get("value") or 0
+                value_source = "tx_vout"
+            else:
+                value_source = "tx_vout_missing_index"
+
+    if not value and not value_source:
+        # try using outspends value if present but maybe falsy
+        if isinstance(out.get("value"), (int, float)) and out.get("value") > 0:
+            value = out.get("value")
+            value_source = "outspends"
+    if not value:
+        # Last-resort: try to proxy by looking at the spent tx's largest output
+        spent = out.get("spent", False)
+        spent_txid = out.get("txid")
+        if spent and spent_txid:
+            if sp_tx is None:
+                value_source = "proxy_error"
+            else:
+                sp_values = _vout_soa(sp_tx)[0]
+                if sp_values.size:
+                    proxy_val = int(sp_values.max())
+                    if proxy_val > 0:
+                        value = proxy_val
+                        value_source = "proxy_spent_largest"
+    # final fallback
+    if value is None:
+        value = 0
+        if not value_source:
+            value_source = "unknown"
+
+    spent = out.get("spent", False)
+    spent_txid = out.get("txid")
+    spent_vin = out.get("vin", None)
+    spent_addr = None
+    if spent and spent_txid and sp_tx is not None:
+        sp_values, sp_addrs, _ = _vout_soa(sp_tx)
+        if sp_values.size:
+            # largest output of the spending tx (first one on ties), one C-level pass
+            spent_addr = sp_addrs[int(sp_values.argmax())] or "NON_STD"
+
+    hop_record.update({
+        "value_sats": int(value) if isinstance(value, (int, float)) else 0,
+        "value_source": value_source,
+        "spent": spent,
+        "spent_in_tx": spent_txid,
+        "spent_in_vin_index": spent_vin,
+        "spent_addr": spent_addr
+    })
+    return hop_record, (spent_txid if spent and spent_txid else None)
+
 def trace_peel_chain(txid, vout_index=0, max_hops=8, force_vout=False):
     """
     Follow a specific vout (txid:vout_index) forward through spends up to max_hops.
@@ -669,97 +1165,16 @@ def trace_peel_chain(txid, vout_index=0, max_hops=8, force_vout=False):
         spent_in_tx, spent_in_vin_index, spent_addr, raw_outspend (optional)
     """
     chain = []
-    cur_tx = txid
-    cur_vout = vout_index
-
-    for hop in range(max_hops):
+    cur_tx, cur_vout = txid, vout_index
+    for depth in range(max_hops):
         try:
-            outspends = get_outspends(cur_tx)
+            hop, next_tx = _peel_hop(cur_tx, cur_vout, force_vout, last_hop=depth + 1 >= max_hops)
         except Exception as e:
-            chain.append({"from_tx": cur_tx, "from_vout": cur_vout, "value_sats": None, "value_source": "outspends_error", "error": f"outspends_failed:{e}"})
-            break
-
-        if cur_vout >= len(outspends):
-            chain.append({"from_tx": cur_tx, "from_vout": cur_vout, "value_sats": None, "value_source": "vout_index_out_of_range", "error": "vout_index_out_of_range"})
+            hop, next_tx = {"from_tx": cur_tx, "from_vout": cur_vout, "value_sats": None, "value_source": "unknown", "error": f"hop_failed:{e}"}, None
+        chain.append(hop)
+        if not next_tx:
             break
-
-        out = outspends[cur_vout]
-        # store raw outspend for debugging transparency
-        hop_record = {"from_tx": cur_tx, "from_vout": cur_vout, "raw_outspend": out}
-
-        # try value from outspends
-        value = out.get("value") if isinstance(out.get("value"), (int, float)) else None
-        value_source = None
-        if force_vout or not value:
-            # fallback: fetch tx.vout
-            try:
-                tx_json = get_tx_json(cur_tx)
-                vouts = tx_json.get("vout", [])
-                if cur_vout < len(vouts):
-                    value = vouts[cur_vout].get("value") or 0
-                    value_source = "tx_vout"
-                else:
-                    value_source = "tx_vout_missing_index"
-            except Exception:
-                value_source = "tx_vout_error"
-
-        if not value and not value_source:
-            # try using outspends value if present but maybe falsy
-            if isinstance(out.get("value"), (int, float)) and out.get("value") > 0:
-                value = out.get("value")
-                value_source = "outspends"
-        if not value:
-            # Last-resort: try to proxy by looking at the spent tx's largest output
-            spent = out.get("spent", False)
-            spent_txid = out.get("txid")
-            if spent and spent_txid:
-                try:
-                    sp_tx = get_tx_json(spent_txid)
-                    outs_sp = sp_tx.get("vout", [])
-                    if outs_sp:
-                        proxy_val = max((o.get("value", 0) for o in outs_sp), default=0)
-                        if proxy_val > 0:
-                            value = proxy_val
-                            value_source = "proxy_spent_largest"
-                except Exception:
-                    value_source = "proxy_error"
-        # final fallback
-        if value is None:
-            value = 0
-            if not value_source:
-                value_source = "unknown"
-
-        spent = out.get("spent", False)
-        spent_txid = out.get("txid")
-        spent_vin = out.get("vin", None)
-        spent_addr = None
-        if spent and spent_txid:
-            try:
-                sp_tx = get_tx_json(spent_txid)
-                outs = sp_tx.get("vout", [])
-                if outs:
-                    candidate = max(outs, key=lambda o: o.get("value", 0))
-                    spent_addr = candidate.get("scriptpubkey_address") or "NON_STD"
-            except Exception:
-                spent_addr = None
-
-        hop_record.update({
-            "value_sats": int(value) if isinstance(value, (int, float)) else 0,
-            "value_source": value_source,
-            "spent": spent,
-            "spent_in_tx": spent_txid,
-            "spent_in_vin_index": spent_vin,
-            "spent_addr": spent_addr
-        })
-        chain.append(hop_record)
-
-        if not spent or not spent_txid:
-            break
-        # move to next hop
-        cur_tx = spent_txid
-        cur_vout = 0
-        time.sleep(SLEEP)
-
+        cur_tx, cur_vout = next_tx, 0
     return chain
 
 
@@ -789,6 +1204,7 @@ PEEL_INDEX_HTML = """
     .small-muted{ color:var(--muted); font-size:13px; }
     footer { text-align:center; color:#8892a6; font-size:13px; margin-top:14px; }
     .help { font-size:13px; color:var(--muted); margin-top:8px; }
+    .flash.error { padding:10px 12px; border-radius:8px; margin-bottom:10px; background:#fff1ec; color:var(--danger); border:1px solid #fbd5c5; }
     @media (max-width:780px){
       .row { flex-direction:column; }
       .controls { flex-direction:column; align-items:stretch; }
@@ -800,6 +1216,7 @@ PEEL_INDEX_HTML = """
     <div class="card">
       <h1>Peel Chain Analysis</h1>
       <p class="lead">Follow a UTXO forward to detect peel-style extraction (remainder hopping + small "peels"). Paste a starting TXID and vout index, then Analyze.</p>
+      {% if error %}<div class="flash error">{{ error }}</div>{% endif %}
 
       <form method="post" action="/peel" enctype="multipart/form-data">
         <div class="row">
@@ -874,7 +1291,7 @@ PEEL_RESULT_HTML = """
           <div class="muted">Start: <strong>{{ label }}</strong> — Run: <strong>{{ run_id }}</strong></div>
         </div>
         <div style="text-align:right">
-          <div class="score">{{ score_display }}</div>
+          <div class="score">{{ "%.3f"|format(score) }}</div>
           <div class="interpret">{{ interpretation }}</div>
         </div>
       </div>
@@ -909,16 +1326,29 @@ PEEL_RESULT_HTML = """
 </html>
 """
 
+# the peel / clustering forms only vary with ESPLORA, so they are rendered once and served
+# as browser-cacheable static pages; validation errors re-render them with the message inline
+# (flash() would only surface on the next visit to /, the one page that renders flashes)
+INDEX_PAGE_MAX_AGE = 600
+_PEEL_INDEX_TMPL = app.jinja_env.from_string(PEEL_INDEX_HTML)
+_PEEL_INDEX_PAGE = _PEEL_INDEX_TMPL.render(ESPLORA=ESPLORA)
+_PEEL_RESULT_TMPL = app.jinja_env.from_string(PEEL_RESULT_HTML)
+
+PEEL_FIELDS = ("from_tx", "from_vout", "value_sats", "value_btc", "value_source", "spent",
+               "spent_in_tx", "spent_addr", "spent_in_vin_index", "error")
+
+def _static_page(html):
+    """Serve a pre-rendered form page (peel / clusters GET) as browser-cacheable HTML."""
+    return Response(html, mimetype="text/html", headers={"Cache-Control": f"public, max-age={INDEX_PAGE_MAX_AGE}"})
 
 @app.route("/peel", methods=["GET", "POST"])
 def peel():
     if request.method == "GET":
-        return render_template_string(PEEL_INDEX_HTML)
+        return _static_page(_PEEL_INDEX_PAGE)
     # POST -> run analysis
     start_tx = request.form.get("txid", "").strip()
     if not start_tx:
-        flash("Please provide a txid", "error")
-        return redirect(url_for("peel"))
+        return _PEEL_INDEX_TMPL.render(ESPLORA=ESPLORA, error="Please provide a txid"), 400
     try:
         vout_index = int(request.form.get("vout", "0"))
     except Exception:
@@ -940,66 +1370,45 @@ def peel():
     # Write CSV (include value_source and optionally raw outspend json)
     csv_name = "peel_chain.csv"
     csv_path = os.path.join(outdir, csv_name)
-    rows = []
-    for hop in chain:
-        row = {
-            "from_tx": hop.get("from_tx"),
-            "from_vout": hop.get("from_vout"),
-            "value_sats": hop.get("value_sats"),
-            "value_btc": sats_to_btc(hop.get("value_sats") or 0),
-            "value_source": hop.get("value_source"),
-            "spent": hop.get("spent"),
-            "spent_in_tx": hop.get("spent_in_tx"),
-            "spent_addr": hop.get("spent_addr"),
-            "spent_in_vin_index": hop.get("spent_in_vin_index"),
-            "error": hop.get("error", "")
-        }
-        if include_raw:
-            row["raw_outspend"] = str(hop.get("raw_outspend", ""))
-        rows.append(row)
-
-    # write csv
-    if rows:
-        fieldnames = list(rows[0].keys())
-    else:
-        fieldnames = ["from_tx","from_vout","value_sats","value_btc","value_source","spent","spent_in_tx","spent_addr","spent_in_vin_index","error"]
+
+    def _rows():
+        # one tuple per hop, in PEEL_FIELDS order (+ raw_outspend)
+        for hop in chain:
+            row = (hop.get("from_tx"), hop.get("from_vout"), hop.get("value_sats"),
+                   sats_to_btc(hop.get("value_sats") or 0), hop.get("value_source"), hop.get("spent"),
+                   hop.get("spent_in_tx"), hop.get("spent_addr"), hop.get("spent_in_vin_index"), hop.get("error", ""))
+            yield row + (str(hop.get("raw_outspend", "")),) if include_raw else row
+
+    # rows are kept (one per hop) so the preview is built from them rather than re-read from disk
+    header = PEEL_FIELDS + (("raw_outspend",) if include_raw else ())
+    rows = list(_rows())
     with open(csv_path, "w", newline="", encoding="utf-8") as fh:
-        w = csv.DictWriter(fh, fieldnames=fieldnames)
-        w.writeheader()
-        for r in rows:
-            w.writerow(r)
+        w = csv.writer(fh)
+        w.writerow(header)
+        w.writerows(rows)
 
     # Compute score and interpretation
     score, details = compute_peel_score(chain)
-    if score >= 0.7:
-        interpretation = "Likely peel chain"
-    elif score >= 0.4:
-        interpretation = "Possible peel chain"
-    else:
-        interpretation = "No clear peel chain"
+    interpretation = interpret_peel_score(score)
 
     # --- simplified: no image rendering, return score + CSV preview ---
-    csv_preview = read_csv_preview(csv_path, max_rows=500)
-    details_text = "\n".join([f"{k}: {v}" for k, v in details.items()])
-
-    # interpretation threshold (adjustable)
-    if score >= 0.75:
-        interpretation = "Likely peel chain"
-    elif score >= 0.45:
-        interpretation = "Possible peel chain"
-    else:
-        interpretation = "No clear peel chain"
+    csv_preview = rows_preview(header, rows, max_rows=500)
+    # details keep full precision; floats are only rounded here for display
+    def _fmt(v):
+        if isinstance(v, float): return f"{v:.3f}"
+        if isinstance(v, list) and v and all(isinstance(r, float) for r in v): return "[" + ", ".join(f"{r:.4f}" for r in v) + "]"
+        return v
+    details_text = "\n".join([f"{k}: {_fmt(v)}" for k, v in details.items()])
 
     # Render a simplified results page (no heavy visualization)
-    return render_template_string(PEEL_RESULT_HTML,
-                                  run_id=run_id,
-                                  label=f"peel:{start_tx}:{vout_index}",
-                                  score_display=round(score, 3),
-                                  interpretation=interpretation,
-                                  details_text=details_text,
-                                  csv_preview=csv_preview,
-                                  csv_name=csv_name,
-                                  img_name=None)
+    return _PEEL_RESULT_TMPL.render(run_id=run_id,
+                                    label=f"peel:{start_tx}:{vout_index}",
+                                    score=score,
+                                    interpretation=interpretation,
+                                    details_text=details_text,
+                                    csv_preview=csv_preview,
+                                    csv_name=csv_name,
+                                    img_name=None)
 
 
 # Note: existing /download/<run_id>/<filename> route will serve the peel outputs.
@@ -1019,6 +1428,7 @@ CLUSTERS_INDEX_HTML = """
     input[type=text], input[type=number] { width:100%; padding:10px; border:1px solid #e6eef8; border-radius:8px; }
     button { background:#0b6ff2; color:#fff; border:none; padding:10px 14px; border-radius:8px; cursor:pointer; font-weight:600; }
     .muted{ color:#66788f; font-size:13px; }
+    .flash.error { padding:10px 12px; border-radius:8px; margin-bottom:10px; background:#fff1ec; color:#c05621; border:1px solid #fbd5c5; }
     footer { text-align:center; color:#8892a6; font-size:13px; margin-top:14px; }
   </style>
 </head>
@@ -1026,6 +1436,7 @@ CLUSTERS_INDEX_HTML = """
   <div class="card">
     <h2>Address clustering</h2>
     <p class="muted">Enter a Bitcoin address and the app will attempt to find likely change addresses / cluster membership using several heuristics.</p>
+    {% if error %}<div class="flash error">{{ error }}</div>{% endif %}
 
     <form method="post" action="/clusters">
       <label><strong>Address</strong></label>
@@ -1109,7 +1520,7 @@ CLUSTERS_RESULT_HTML = """
       </div>
 
       <div class="controls">
-        <a class="button" href="{{ url_for('download', run_id=run_id, filename=csv_name) }}">Download CSV</a>
+        <a class="button" href="{{ url_for('download', run_id=outdir|basename, filename=csv_name) }}">Download CSV</a>
         <a class="button" href="{{ url_for('index') }}" style="background:#e6eef8;color:#0b6ff2">Back to tracer</a>
       </div>
     </div>
@@ -1118,40 +1529,70 @@ CLUSTERS_RESULT_HTML = """
 </html>
 """
 
+CLUSTERS_PENDING_HTML = """
+<!doctype html>
+<html>
+<head>
+  <meta charset="utf-8">
+  <title>Clustering… — UTXO Tracer</title>
+  <link href="https://fonts.googleapis.com/css2?family=Inter:wght@300;400;600;700&display=swap" rel="stylesheet">
+  <noscript><meta http-equiv="refresh" content="3"></noscript>
+  <style>
+    body{font-family:Inter,system-ui,-apple-system,Segoe UI,Roboto,Helvetica,Arial;background:#f6f8fb;padding:18px;color:#0b1726}
+    .container{max-width:1200px;margin:10px auto}
+    .card{background:#fff;border-radius:12px;padding:16px;box-shadow:0 8px 30px rgba(16,24,40,0.06)}
+    .muted{color:#66788f;font-size:13px}
+  </style>
+</head>
+<body>
+  <div class="container">
+    <div class="card">
+      <div style="font-weight:700">Clustering <strong>{{ address }}</strong>…</div>
+      <div class="muted">Fetching the address history and scoring change candidates. This page updates when the run finishes.</div>
+    </div>
+  </div>
+  <script>
+  (function poll(){
+    fetch("{{ url_for('cluster_status', run_id=run_id) }}").then(function(r){ return r.json(); }).then(function(s){
+      if(s.state === "running"){ setTimeout(poll, 1500); } else { location.reload(); }
+    }).catch(function(){ setTimeout(poll, 3000); });
+  })();
+  </script>
+</body>
+</html>
+"""
+
+_CLUSTERS_INDEX_TMPL = app.jinja_env.from_string(CLUSTERS_INDEX_HTML)
+_CLUSTERS_INDEX_PAGE = _CLUSTERS_INDEX_TMPL.render(ESPLORA=ESPLORA)
+_CLUSTERS_RESULT_TMPL = app.jinja_env.from_string(CLUSTERS_RESULT_HTML)
+_CLUSTERS_PENDING_TMPL = app.jinja_env.from_string(CLUSTERS_PENDING_HTML)
+
 # helper: fetch address txs (paginated)
 def get_address_txs(addr, limit=500, confirmed_only=True):
     """
     Fetch txs for address using Esplora /address/:addr/txs (paginated).
     Returns a list of tx JSON objects (most recent first). We stop when limit reached.
     If confirmed_only=True we filter out mempool txs by relying on Esplora's result (it returns mempool txs too).
+    Results are cached per (addr, limit, confirmed_only) for TTL_ADDRESS_TXS.
     """
+    key = f"addrtx:{addr}:{limit}:{int(bool(confirmed_only))}"
+    res = _cache_get_json(key, l1=False)  # up to `limit` full tx JSONs: too big for L1
+    if res is not None:
+        return res
     out = []
-    url_base = f"{ESPLORA}/address/{addr}/txs"
-    last_seen = None
+    max_pages = limit // 25 + 2  # first page may carry mempool txs on top of 25 confirmed
     try:
-        while len(out) < limit:
-            url = url_base if not last_seen else f"{url_base}/chain/{last_seen}"
-            r = requests.get(url, timeout=30)
-            r.raise_for_status()
-            page = r.json()
-            if not page:
-                break
-            for tx in page:
-                # Esplora uses status.confirmed (boolean) rather than a numeric confirmations field.
-                if confirmed_only and not tx.get("status", {}).get("confirmed", False):
-                    # skip mempool/unconfirmed txs
-                    continue
-                out.append(tx)
-                if len(out) >= limit:
-                    break
-            # Esplora's /txs returns a page; last element's txid used as chain param
-            last_seen = page[-1].get("txid")
-            # if page length < 25 (default) we are at end
-            if len(page) < 25:
+        for tx in _address_txs_stream(addr, max_pages=max_pages):
+            # Esplora uses status.confirmed (boolean) rather than a numeric confirmations field.
+            if confirmed_only and not tx.get("status", {}).get("confirmed", False):
+                continue
+            out.append(tx)
+            if len(out) >= limit:
                 break
     except Exception:
-        # best-effort: return whatever we collected
-        pass
+        # best-effort: return whatever we collected (not cached)
+        return out
+    _cache_set_json(key, out, TTL_ADDRESS_TXS, l1=False)
     return out
 
 def is_address_single_use_in_tx(addr, txid):
@@ -1173,29 +1614,112 @@ def is_address_single_use_in_tx(addr, txid):
         return False
 
 
+# 10**1 .. 10**16: any valid amount (<= 21e6 BTC = 2.1e15 sats) has fewer than 16 trailing zeros
+_TZ_POWERS = tuple(10 ** k for k in range(1, 17))
+
 def trailing_zeros_in_sats(sats):
     """Return number of trailing zeros in integer sats (fast heuristic for 'round' amounts)."""
-    if not isinstance(sats, int) or sats <= 0:
+    if not isinstance(sats, int) or sats <= 0 or sats % 10:
         return 0
+    # divisibility by increasing powers of ten; stops at the first that doesn't divide
     tz = 0
-    while sats % 10 == 0:
+    for p in _TZ_POWERS:
+        if sats % p:
+            break
         tz += 1
-        sats //= 10
     return tz
 
 # add near other helpers
 def get_address_stats(addr):
-    """Return Esplora address info (chain_stats) or None on failure."""
+    """Return Esplora address info (chain_stats) or None on failure; cached for TTL_ADDRESS_TXS."""
     if not addr or addr.startswith("NON_STD") or addr.startswith("UNKNOWN"):
         return None
+    key = f"addrstats:{addr}"
+    res = _cache_get_json(key)
+    if res is not None:
+        return res
     url = f"{ESPLORA}/address/{addr}"
     try:
-        r = requests.get(url, timeout=12)
-        r.raise_for_status()
-        return r.json().get("chain_stats", {})  # contains tx_count, funded_txo_sum, etc.
+        res = _esplora_get(url, timeout=12).get("chain_stats", {})  # contains tx_count, funded_txo_sum, etc.
     except Exception:
         return None
+    _cache_set_json(key, res, TTL_ADDRESS_TXS)
+    return res
 
+# below this many outputs the per-call overhead outweighs the array scoring (much lower with numba)
+VEC_MIN_VOUTS = 8 if numba is not None else 32
+
+def _score_vouts_np(sats, script_match, total_in, is_coinjoin_like):
+    """Heuristic masks and clamped int scores (hundredths) for int64 sats; returns (scores, high_decimal, round_amount, smaller)."""
+    # many decimals (>= 6 of 8 BTC digits, i.e. not a multiple of 1000 sats) -> likely random/change-like
+    high_decimal = sats % 1000 != 0
+    # many trailing zeros (>= 5) -> likely round payment (not change)
+    round_amount = (sats > 0) & (sats % 100000 == 0)
+    # continuity heuristic: vout < total_in (remainder behavior)
+    smaller = (sats > 0) & (sats < total_in * 0.95)
+    scores = 20 * high_decimal - 15 * round_amount + 15 * script_match + 10 * smaller
+    # coinjoin: if tx looks coinjoin-like, reduce confidence in any single-change candidate
+    if is_coinjoin_like:
+        scores -= 20
+    return np.clip(scores, -100, 100), high_decimal, round_amount, smaller
+
+if numba is not None:
+    @numba.njit(cache=True)
+    def _score_vouts_nb(sats, script_match, total_in, is_coinjoin_like):
+        """Compiled single-loop equivalent of _score_vouts_np (same return tuple)."""
+        n = sats.shape[0]
+        scores = np.empty(n, np.int64); high_decimal = np.zeros(n, np.bool_)
+        round_amount = np.zeros(n, np.bool_); smaller = np.zeros(n, np.bool_)
+        for i in range(n):
+            x = sats[i]; score = 0
+            if x % 1000 != 0:
+                high_decimal[i] = True; score += 20
+            if x > 0 and x % 100000 == 0:
+                round_amount[i] = True; score -= 15
+            if script_match[i]:
+                score += 15
+            if 0 < sats[i] < total_in * 0.95:
+                smaller[i] = True; score += 10
+            if is_coinjoin_like:
+                score -= 20
+            scores[i] = max(-100, min(100, score))
+        return scores, high_decimal, round_amount, smaller
+
+def _change_candidates_vec(sats, addrs, stypes, major_script, total_in, is_coinjoin_like):
+    """
+    detect_change_candidates_for_tx scoring for wide txs (batched payouts, coinjoins):
+    the heuristics run over the int64 sats column (numba kernel if installed, else numpy
+    masks), then the result rows are built in one pass. Same rows as the per-output loop.
+    """
+    n = sats.shape[0]
+    # script-type heuristic: matches majority input script type
+    if major_script:
+        script_match = np.fromiter((st == major_script for st in stypes), dtype=bool, count=n)
+    else:
+        script_match = np.zeros(n, dtype=bool)
+    score_fn = _score_vouts_nb if numba is not None else _score_vouts_np
+    scores, high_decimal, round_amount, smaller = score_fn(sats, script_match, float(total_in), bool(is_coinjoin_like))
+
+    # one Python pass to build the result rows
+    results = []
+    for idx, (a, sv, sc, hd, ra, sm, sl) in enumerate(zip(addrs, sats.tolist(), scores.tolist(), high_decimal.tolist(),
+                                                           round_amount.tolist(), script_match.tolist(), smaller.tolist())):
+        flags = []
+        if hd: flags.append("high_decimal")
+        if ra: flags.append("round_amount")
+        if sm: flags.append("script_match")
+        if sl: flags.append("smaller_than_inputs")
+        if is_coinjoin_like: flags.append("coinjoin_like")
+        results.append({
+            "vout_index": idx,
+            "address": a or f"NON_STD_{idx}",
+            "value_sats": sv,
+            "score": sc / 100,
+            "flags": flags
+        })
+    return results
+
+@_memoize_by_txid
 def detect_change_candidates_for_tx(tx_json, target_input_addrs=None):
     """
     For a given tx_json, compute candidate change outputs and score each candidate with heuristics:
@@ -1207,77 +1731,68 @@ def detect_change_candidates_for_tx(tx_json, target_input_addrs=None):
     Returns list of dicts: {"vout_index", "address","value_sats","score", "flags":[...]}
     """
     results = []
-    vouts = tx_json.get("vout", [])
-    txid = tx_json.get("txid")
+    sats_arr, addrs, stypes = _vout_soa(tx_json)
     # coinjoin check: if two or more outputs share same value -> coinjoin-like
-    values = [int(v.get("value") or 0) for v in vouts]
-    value_counts = {}
-    for v in values:
-        value_counts[v] = value_counts.get(v, 0) + 1
+    values = sats_arr.tolist()
+    value_counts = Counter(values)
     is_coinjoin_like = any(cnt >= 2 for cnt in value_counts.values())
 
-    # majority input script type
+    # majority input script type and total input value, in one pass over vin
     vin_script_types = []
+    total_in = 0
     for vin in tx_json.get("vin", []):
         prev = vin.get("prevout") or {}
         st = prev.get("scriptpubkey_type")
         if st:
             vin_script_types.append(st)
-    major_script = None
-    if vin_script_types:
-        major_script = max(set(vin_script_types), key=vin_script_types.count)
-
-    total_in = sum([int(vin.get("prevout", {}).get("value", 0) or 0) for vin in tx_json.get("vin", [])]) or 1
+        total_in += int(prev.get("value", 0) or 0)
+    total_in = total_in or 1
+    major_script = Counter(vin_script_types).most_common(1)[0][0] if vin_script_types else None
 
-    for idx, v in enumerate(vouts):
-        addr = v.get("scriptpubkey_address") or f"NON_STD_{idx}"
-        sats = int(v.get("value") or 0)
-        flags = []
-        score = 0.0
+    if len(values) >= VEC_MIN_VOUTS:
+        results = _change_candidates_vec(sats_arr, addrs, stypes, major_script, total_in, is_coinjoin_like)
+    else:
+        for idx, (addr, sats, out_script) in enumerate(zip(addrs, values, stypes)):
+            addr = addr or f"NON_STD_{idx}"
+            flags = []
+            score = 0  # hundredths: integer sums stay exact, so no rounding before the thresholds
 
-        # Decimal / rounding heuristic
-        try:
-            btc_str = f"{sats/1e8:.8f}"
-            dec_part = btc_str.split(".")[1].rstrip("0")
-            dec_len = len(dec_part)
-            if dec_len >= 6:   # many decimals -> likely random/change-like
+            # Decimal / rounding heuristic: >= 6 of the 8 BTC decimals used <=> sats not a multiple of 1000
+            if sats % 1000 != 0:   # many decimals -> likely random/change-like
                 flags.append("high_decimal")
-                score += 0.20
-        except Exception:
-            pass
-
-        # trailing zeros heuristic: if sats has many trailing zeros -> likely round payment (not change)
-        tz = trailing_zeros_in_sats(sats)
-        if tz >= 5:
-            flags.append("round_amount")
-            score -= 0.15
-
-        # script-type heuristic
-        if major_script:
-            out_script = v.get("scriptpubkey_type")
-            if out_script == major_script:
-                flags.append("script_match")
-                score += 0.15
-
-        # continuity heuristic: vout < total_in (remainder behavior)
-        if total_in > 0 and 0 < sats < total_in * 0.95:
-            flags.append("smaller_than_inputs")
-            score += 0.10
-
-        # coinjoin: if tx looks coinjoin-like, reduce confidence in any single-change candidate
-        if is_coinjoin_like:
-            flags.append("coinjoin_like")
-            score -= 0.20
-
-        # sanity clamp and collect
-        score = max(-1.0, min(1.0, score))
-        results.append({
-            "vout_index": idx,
-            "address": addr,
-            "value_sats": sats,
-            "score": round(score, 3),
-            "flags": flags
-        })
+                score += 20
+
+            # trailing zeros heuristic: if sats has many trailing zeros -> likely round payment (not change)
+            tz = trailing_zeros_in_sats(sats)
+            if tz >= 5:
+                flags.append("round_amount")
+                score -= 15
+
+            # script-type heuristic
+            if major_script:
+                if out_script == major_script:
+                    flags.append("script_match")
+                    score += 15
+
+            # continuity heuristic: vout < total_in (remainder behavior)
+            if total_in > 0 and 0 < sats < total_in * 0.95:
+                flags.append("smaller_than_inputs")
+                score += 10
+
+            # coinjoin: if tx looks coinjoin-like, reduce confidence in any single-change candidate
+            if is_coinjoin_like:
+                flags.append("coinjoin_like")
+                score -= 20
+
+            # sanity clamp and collect
+            score = max(-100, min(100, score))
+            results.append({
+                "vout_index": idx,
+                "address": addr,
+                "value_sats": sats,
+                "score": score / 100,
+                "flags": flags
+            })
 
     # If only one output has positive score and others are negative/low, bump it (exclusive candidate)
     positive = [r for r in results if r["score"] > 0]
@@ -1287,135 +1802,115 @@ def detect_change_candidates_for_tx(tx_json, target_input_addrs=None):
 
     return results
 
-def cluster_from_address(seed_address, max_txs=200, confirmed_only=True):
+CLUSTER_FIELDS = ("address", "inferred_change_count", "possible_change", "flags")
+
+def cluster_from_address(seed_address, max_txs=200, confirmed_only=True, run_id=None):
     """
     Main driver:
       - fetch address txs
       - for every tx, apply common-input clustering (union inputs)
       - for txs spending from seed (i.e., seed used in inputs), detect change candidates and
         add likely change addresses to cluster set (via threshold)
-    Returns dict with metadata, clusters list, candidates list, csv_path, and summary.
+    Returns dict with metadata, cluster members, candidate count + examples, csv_path, csv_preview and summary.
     """
-    run_id = uuid.uuid4().hex[:12]
+    run_id = run_id or uuid.uuid4().hex[:12]
     outdir = os.path.join(OUTPUT_ROOT, "clusters_" + run_id)
     os.makedirs(outdir, exist_ok=True)
 
     txs = get_address_txs(seed_address, limit=max_txs, confirmed_only=confirmed_only)
     txs_scanned = len(txs)
-    uf = UnionFind()
-    change_candidates_all = []
+    input_lists = []
     seed_in_input_txids = set()
 
-    # 1) common-input-ownership clustering: union all input addresses within each tx
+    # 1) common-input-ownership clustering: all input addresses within each tx belong together
     for tx in txs:
         txid = tx.get("txid")
         inputs = []
+        seed_is_input = False
         for vin in tx.get("vin", []):
             prev = vin.get("prevout") or {}
             addr = prev.get("scriptpubkey_address")
             if addr:
                 inputs.append(addr)
-        if len(inputs) >= 2:
-            base = inputs[0]
-            for o in inputs[1:]:
-                uf.union(base, o)
+                if addr == seed_address:
+                    seed_is_input = True
+        input_lists.append(inputs)
         # record txids where seed address is an input (we'll inspect outputs for change)
-        for vin in tx.get("vin", []):
-            prev = vin.get("prevout") or {}
-            if prev.get("scriptpubkey_address") == seed_address:
-                seed_in_input_txids.add(txid)
+        if seed_is_input:
+            seed_in_input_txids.add(txid)
 
     # 2) For txs where seed was an input, evaluate change candidates
-    for tx in txs:
-        txid = tx.get("txid")
-        if txid not in seed_in_input_txids:
-            continue
-        candidates = detect_change_candidates_for_tx(tx, target_input_addrs=[seed_address])
-        # threshold: anything with score >= 0.15 considered a *possible* change (conservative)
-        for c in candidates:
-            if c["score"] >= 0.15:
-                # record as possible candidate (but DO NOT auto-union)
-                change_candidates_all.append({**c, "source_tx": txid})
-                # DO NOT call uf.union(seed_address, c["address"])  # <-- removed: not confirmed
-
-
-    clusters = uf.groups()
-    root = uf.find(seed_address)
-    members = clusters.get(root, [])
-    # ensure seed present
-    if seed_address not in members:
-        members.append(seed_address)
-
-        # write CSV of members + possible candidates
-    csv_name = "clusters_from_address.csv"
-    csv_path = os.path.join(outdir, csv_name)
-    rows = []
-
-    # candidate aggregation: how many times each address was flagged as a possible change
-    cand_map = {}
-    for c in change_candidates_all:
-        cand_map.setdefault(c["address"], []).append(c)
-
-    # members from canonical UNION (common-input clusters)
-    members = clusters.get(uf.find(seed_address), [])
-    if seed_address not in members:
-        members.append(seed_address)
+    def _candidates():
+        for tx in txs:
+            txid = tx.get("txid")
+            if txid not in seed_in_input_txids:
+                continue
+            candidates = detect_change_candidates_for_tx(tx, target_input_addrs=[seed_address])
+            # threshold: anything with score >= 0.15 considered a *possible* change (conservative)
+            for c in candidates:
+                if c["score"] >= 0.15:
+                    # record as possible candidate (but DO NOT auto-union)
+                    yield txid, c
+                    # DO NOT call uf.union(seed_address, c["address"])  # <-- removed: not confirmed
+
+    # candidate aggregation as candidates are produced: how many times each address was
+    # flagged as a possible change, and with which flags (no per-candidate list is kept)
+    cand_count = Counter()
+    cand_flags = defaultdict(set)
+    examples = []
+    for txid, c in _candidates():
+        cand_count[c["address"]] += 1
+        cand_flags[c["address"]].update(c["flags"])
+        if len(examples) < 8:
+            examples.append({**c, "source_tx": txid})
+    candidate_count = sum(cand_count.values())
+
+    component = common_input_components(input_lists)
+    seed_component = component.get(seed_address)
+    # the seed belongs to its own component, so it is only missing when it never was an input
+    if seed_component is None:
+        members = [seed_address]
+    else:
+        members = [a for a, c in component.items() if c == seed_component]
 
     # write CSV of members + possible candidates
     csv_name = "clusters_from_address.csv"
     csv_path = os.path.join(outdir, csv_name)
-    rows = []
-
-    # candidate aggregation: how many times each address was flagged as a possible change
-    cand_map = {}
-    for c in change_candidates_all:
-        cand_map.setdefault(c["address"], []).append(c)
-
-    # produce rows: include both confirmed-members (from union) and possible candidates (flagged)
-    seen_addresses = set()
-    for m in members:
-        row = {
-            "address": m,
-            "inferred_change_count": len(cand_map.get(m, [])),
-            "possible_change": "yes" if m in cand_map else "no"
-        }
-        if m in cand_map:
-            allflags = []
-            for c in cand_map[m]:
-                allflags += c.get("flags", [])
-            row["flags"] = ",".join(sorted(set(allflags)))
-        else:
-            row["flags"] = ""
-        rows.append(row)
-        seen_addresses.add(m)
 
-    # Also list any possible candidates that were NOT in the union-member list
-    for addr, candlist in cand_map.items():
-        if addr in seen_addresses:
-            continue
-        allflags = []
-        for c in candlist:
-            allflags += c.get("flags", [])
-        rows.append({
-            "address": addr,
-            "inferred_change_count": len(candlist),
-            "possible_change": "yes",
-            "flags": ",".join(sorted(set(allflags)))
-        })
+    def _flags(addr):
+        fs = cand_flags[addr]
+        # a single flag (or none) needs no sort
+        return ",".join(sorted(fs)) if len(fs) > 1 else next(iter(fs), "")
+
+    def _rows():
+        # produce rows (CLUSTER_FIELDS order): include both confirmed-members (from union)
+        # and possible candidates (flagged)
+        for m in members:
+            n = cand_count.get(m)  # one lookup serves both the count and possible_change
+            if n:
+                yield (m, n, "yes", _flags(m))
+            else:
+                yield (m, 0, "no", "")
+        seen_addresses = set(members)
+        # Also list any possible candidates that were NOT in the union-member list (first-seen order)
+        for addr in (a for a in cand_count if a not in seen_addresses):
+            yield (addr, cand_count[addr], "yes", _flags(addr))
 
     # write csv (include possible_change in header)
-    with open(csv_path, "w", newline="", encoding="utf-8") as fh:
-        fieldnames = ["address", "inferred_change_count", "possible_change", "flags"]
-        w = csv.DictWriter(fh, fieldnames=fieldnames)
-        w.writeheader()
-        for r in rows:
-            w.writerow(r)
+    with open(csv_path, "w", newline="", encoding="utf-8", buffering=1<<20) as fh:
+        w = csv.writer(fh)
+        w.writerow(CLUSTER_FIELDS)
+        rows = _rows()
+        # the first rows double as the result-page preview, so the CSV is not read back
+        head = list(itertools.islice(rows, 500))
+        w.writerows(head)
+        w.writerows(rows)
 
     # build summary text
     summary_lines = [
         f"Seed address: {seed_address}",
         f"TXs scanned: {txs_scanned} (confirmed_only={confirmed_only})",
-        f"Change candidates found: {len(change_candidates_all)}",
+        f"Change candidates found: {candidate_count}",
         f"Cluster members (count): {len(members)}",
         "",
         "Note: uniqueness (first-seen) rule is NOT being enforced in this run.",
@@ -1425,8 +1920,8 @@ def cluster_from_address(seed_address, max_txs=200, confirmed_only=True):
         "Top change candidate examples:"
     ]
 
-    for c in change_candidates_all[:8]:
-        summary_lines.append(f"- {c['address']} (tx={c['source_tx']}) sats={c['value_sats']} score={c['score']} flags={','.join(c['flags'])}")
+    summary_lines += [f"- {c['address']} (tx={c['source_tx']}) sats={c['value_sats']} score={c['score']} flags={','.join(c['flags'])}"
+                      for c in examples]
 
     summary_text = "\n".join(summary_lines)
 
@@ -1435,44 +1930,96 @@ def cluster_from_address(seed_address, max_txs=200, confirmed_only=True):
         "outdir": outdir,
         "csv_path": csv_path,
         "csv_name": csv_name,
+        "csv_preview": rows_preview(CLUSTER_FIELDS, head),
         "members": members,
-        "candidates": change_candidates_all,
+        "candidate_count": candidate_count,
+        "candidate_examples": examples,
         "txs_scanned": txs_scanned,
         "summary_text": summary_text
     }
 
+def cluster_from_address_cached(seed_address, max_txs=200, confirmed_only=True, run_id=None):
+    """
+    cluster_from_address, reusing the result of an identical run (same address, max_txs and
+    confirmed_only) from the last TTL_CLUSTER_RESULT seconds as long as its CSV still exists.
+    """
+    key = f"cluster:{seed_address}:{max_txs}:{int(confirmed_only)}"
+    res = _cache_get_json(key, l1=False)
+    if res is not None and os.path.isfile(res["csv_path"]):
+        return res
+    res = cluster_from_address(seed_address, max_txs=max_txs, confirmed_only=confirmed_only, run_id=run_id)
+    _cache_set_json(key, res, TTL_CLUSTER_RESULT, l1=False)
+    return res
+
+# /clusters runs are background jobs: the POST returns at once and the result page polls
+# /status/<run_id>. The registry is in-process (see the gunicorn note in the README).
+CLUSTER_JOB_WORKERS = 2
+CLUSTER_JOBS_MAX = 256
+_cluster_pool = ThreadPoolExecutor(max_workers=CLUSTER_JOB_WORKERS)
+_cluster_jobs = {}  # run_id -> (address, Future), oldest first
+_cluster_jobs_lock = threading.Lock()
+
+def submit_cluster_job(seed_address, max_txs=200, confirmed_only=True):
+    """Queue cluster_from_address_cached on the job pool; returns the run_id to poll."""
+    run_id = uuid.uuid4().hex[:12]
+    fut = _cluster_pool.submit(cluster_from_address_cached, seed_address, max_txs=max_txs,
+                               confirmed_only=confirmed_only, run_id=run_id)
+    with _cluster_jobs_lock:
+        if len(_cluster_jobs) >= CLUSTER_JOBS_MAX:
+            _cluster_jobs.pop(next(iter(_cluster_jobs)))  # forget the oldest job
+        _cluster_jobs[run_id] = (seed_address, fut)
+    return run_id
+
 # routes
 @app.route("/clusters", methods=["GET", "POST"])
 def clusters():
     if request.method == "GET":
-        return render_template_string(CLUSTERS_INDEX_HTML, ESPLORA=ESPLORA)
+        return _static_page(_CLUSTERS_INDEX_PAGE)
     addr = request.form.get("address", "").strip()
     if not addr:
-        flash("Please provide an address", "error")
-        return redirect(url_for("clusters"))
-    try:
-        max_txs = int(request.form.get("max_txs", "200"))
-    except Exception:
-        max_txs = 200
+        return _CLUSTERS_INDEX_TMPL.render(ESPLORA=ESPLORA, error="Please provide an address"), 400
+    raw = request.form.get("max_txs", "200").strip()
+    max_txs = min(max(int(raw), 1), MAX_CLUSTER_TXS) if raw.isdecimal() else 200
     confirmed_only = request.form.get("confirmed_only", "1") == "1"
 
+    run_id = submit_cluster_job(addr, max_txs=max_txs, confirmed_only=confirmed_only)
+    return redirect(url_for("cluster_result", run_id=run_id))
+
+@app.route("/status/<run_id>")
+def cluster_status(run_id):
+    """State of a /clusters job as JSON: running, done or error (with the message)."""
+    job = _cluster_jobs.get(run_id)
+    if job is None:
+        return jsonify({"state": "unknown"}), 404
+    fut = job[1]
+    if not fut.done():
+        return jsonify({"state": "running"})
+    e = fut.exception()
+    return jsonify({"state": "error", "error": str(e)}) if e else jsonify({"state": "done"})
+
+@app.route("/clusters/<run_id>")
+def cluster_result(run_id):
+    job = _cluster_jobs.get(run_id)
+    if job is None:
+        return _CLUSTERS_INDEX_TMPL.render(ESPLORA=ESPLORA, error="Unknown or expired clustering run"), 404
+    addr, fut = job
+    if not fut.done():
+        return _CLUSTERS_PENDING_TMPL.render(run_id=run_id, address=addr)
     try:
-        res = cluster_from_address(addr, max_txs=max_txs, confirmed_only=confirmed_only)
+        res = fut.result()
     except Exception as e:
-        flash(f"Clustering failed: {e}", "error")
-        return redirect(url_for("clusters"))
+        return _CLUSTERS_INDEX_TMPL.render(ESPLORA=ESPLORA, error=f"Clustering failed: {e}"), 500
 
-    csv_preview = read_csv_preview(res["csv_path"], max_rows=500)
-    return render_template_string(CLUSTERS_RESULT_HTML,
-                                  run_id=res["run_id"],
-                                  outdir=res["outdir"],
-                                  address=addr,
-                                  txs_scanned=res["txs_scanned"],
-                                  clusters_count=len(res["members"]),
-                                  summary_text=res["summary_text"],
-                                  csv_preview=csv_preview,
-                                  csv_name=res["csv_name"])
+    return _CLUSTERS_RESULT_TMPL.render(run_id=res["run_id"],
+                                        outdir=res["outdir"],
+                                        address=addr,
+                                        txs_scanned=res["txs_scanned"],
+                                        clusters_count=len(res["members"]),
+                                        summary_text=res["summary_text"],
+                                        csv_preview=res["csv_preview"],
+                                        csv_name=res["csv_name"])
 
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    # development server only (FLASK_DEBUG=1 for the reloader/debugger); deploy behind gunicorn, see README
+    app.run(debug=os.environ.get("FLASK_DEBUG") == "1", threaded=True)